@@ -0,0 +1,939 @@
+import asyncio
+import logging
+import math
+import httpx
+from SpacePyTradersV2 import models
+from SpacePyTradersV2.cache import request_key, invalidation_scopes, SingleFlight
+from SpacePyTradersV2.client import (V2_URL, json_dumps, json_loads, param_keywords, request_headers, check_page,
+                                    retry_exceptions, ThrottleException, ServerException, TooManyTriesException)
+from SpacePyTradersV2.throttle import api_limiter, retry_delay, retry_after_hint, cooldown_ship, ship_cooldowns
+
+
+def new_session():
+    """Creates an httpx client speaking HTTP/2, so concurrent requests are multiplexed over one kept alive
+    connection instead of each needing their own"""
+    return httpx.AsyncClient(http2=True, limits=httpx.Limits(max_connections=64, max_keepalive_connections=64))
+
+
+def _request_kwargs(method, params):
+    """Maps the params of a call onto the httpx keyword matching how `make_request` sends them"""
+    if params is None:
+        return {}
+    keyword = param_keywords[method]
+    if keyword == "json":  # encode the body ourselves, httpx would use the stdlib
+        return {"content": json_dumps(params)}
+    return {keyword: params}
+
+
+class AsyncClient:
+    def __init__(self, username=None, token=None, max_concurrent=10, session=None, cache=None):
+        """Asynchronous counterpart of the Client class. Every endpoint is a coroutine so many calls can be in
+        flight at once, e.g. with `asyncio.gather`. Unless a session is given, the underlying httpx client is
+        created on first use and should be released with `close()` or by using the client as an async context
+        manager.
+
+        Parameters:
+            username (str): Username of the user
+            token (str): The personal auth token for the user
+            max_concurrent (int, optional): How many requests this client lets be in flight at once. Defaults to 10.
+            session (httpx.AsyncClient, optional): Session to share with other clients. It is not closed by
+                this client. Defaults to None.
+            cache (TTLCache, optional): Cache for the responses of GET requests, see `Client`. Defaults to None.
+        """
+        self.username = username
+        self.token = token
+        self.url = V2_URL
+        self._session = session
+        self._owns_session = session is None
+        self.max_concurrent = max_concurrent
+        self.cache = cache
+        # Bound to the event loop the client is used from, see `_bind_loop`
+        self._loop = None
+        self._sem = None
+        self._inflight = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def _bind_loop(self):
+        """Creates the semaphore and the record of requests in flight for the running event loop, and drops a
+        session this client created on another loop. asyncio primitives and httpx connections only work on the loop
+        they were first used on, so a client used by consecutive `asyncio.run` calls needs fresh ones each time."""
+        loop = asyncio.get_running_loop()
+        if loop is self._loop:
+            return
+        self._loop = loop
+        self._sem = asyncio.Semaphore(self.max_concurrent)
+        self._inflight = SingleFlight()
+        if self._owns_session:
+            self._session = None  # its connections belong to the previous loop
+
+    def _get_session(self):
+        if self._session is None or self._session.is_closed:
+            self._session = new_session()
+            self._owns_session = True
+        return self._session
+
+    async def close(self):
+        """Closes the underlying httpx client if it was created by this client"""
+        if self._owns_session and self._session is not None and not self._session.is_closed:
+            await self._session.aclose()
+        if self._owns_session:
+            self._session = None
+
+    async def generic_api_call(self, method, endpoint, params=None, token=None, warning_log=None, raw_res=False,
+                               throttle_time=10):
+        """Async version of `Client.generic_api_call`. Handles any throttling or error returned by the Space
+        Traders API. Identical GET requests made while one is in flight share its result.
+
+        Parameters:
+            method (str): The HTTP method to use. GET, POST, PUT, PATCH or DELETE
+            endpoint (str): The API endpoint
+            params (dict, optional): Any params required for the endpoint. Defaults to None.
+            token (str, optional): The token of the user. Defaults to None.
+            warning_log (str or tuple, optional): Message logged if the call fails. A tuple of a format string and
+                its arguments is only formatted when the call fails. Defaults to None.
+            raw_res (bool, default = False): Returns the request response's JSON by default. Can be set to True to return the request response.
+            throttle_time (int, default = 10): Longest wait before attempting the call again. The wait follows the
+                server's Retry-After hint when given, otherwise it doubles with every retry. Default is 10 seconds
+
+        Returns:
+            Any: depends on the return from the API but likely JSON, False if the call failed
+        """
+        self._bind_loop()
+        if method != "GET" or raw_res:
+            return await self._api_call(method, endpoint, params, token, warning_log, raw_res, throttle_time)
+        key = request_key(self.url, token, endpoint, params)
+        res = await self._inflight.do_async(key, lambda: self._api_call(method, endpoint, params, token,
+                                                                        warning_log, raw_res, throttle_time))
+        return json_loads(res) if isinstance(res, bytes) else res
+
+    async def _api_call(self, method, endpoint, params, token, warning_log, raw_res, throttle_time):
+        # Makes the call for generic_api_call, which lets identical GET requests in flight share one call. Successful
+        # GETs return the encoded body, so each caller sharing it decodes its own copy
+        cooldown_symbol = cooldown_ship(method, endpoint)
+        if cooldown_symbol is not None:
+            remaining = ship_cooldowns.remaining(cooldown_symbol)
+            if remaining:  # the API would refuse the action, spare the request
+                logging.warning("Not calling %s %s, ship %s is on cooldown for another %.1f seconds",
+                                method, endpoint, cooldown_symbol, remaining)
+                return False
+        headers = request_headers(token)
+        cache_key = None
+        if self.cache is not None and not raw_res:
+            if method == "GET":
+                cache_key = request_key(self.url, token, endpoint, params)
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    return cached
+                etag = self.cache.etag(cache_key)
+                if etag is not None:  # ask the server to only send the response if it has changed
+                    headers = {**headers, 'If-None-Match': etag}
+            else:
+                for prefix, last_segment in invalidation_scopes(endpoint):
+                    self.cache.invalidate(prefix, self.url, token, last_segment)
+        session = self._get_session()
+        for i in range(10):
+            try:
+                await api_limiter.acquire_async()
+                async with self._sem:
+                    r = await session.request(method, self.url + endpoint, headers=headers,
+                                              **_request_kwargs(method, params))
+                api_limiter.observe(r.headers.get('x-ratelimit-remaining'))
+                if r.status_code == 204:
+                    return None
+                if r.status_code == 304 and cache_key is not None:
+                    cached = self.cache.revalidate(cache_key, self.cache.ttl_for(endpoint))
+                    if cached is not None:
+                        return cached
+                    headers = request_headers(token)  # dropped meanwhile, fetch it in full
+                    continue
+                body = json_loads(r.content) if r.content else None
+                # If an error returned from api
+                if body and 'error' in body:
+                    code = body['error']['code']
+                    message = body['error']['message']
+                    logging.warning("An error has occurred when hitting: %s %s with parameters: %s. Error: %s",
+                                    method, r.url, params, body)
+
+                    # Retry if throttling or server error
+                    retry_exception = retry_exceptions.get(code)
+                    if retry_exception is not None:
+                        raise retry_exception(body)
+
+                    # Unknown handling for error
+                    if isinstance(warning_log, tuple):  # format the message only now that the call has failed
+                        logging.warning(*warning_log)
+                    else:
+                        logging.warning(warning_log)
+                    logging.exception("Something broke the script. Code: %s Error Message: %s ", code, message)
+                    return False
+                # If successful return r
+                api_limiter.speed_up()
+                if cooldown_symbol is not None and body:
+                    cooldown = body['data'].get('cooldown')
+                    if cooldown:
+                        ship_cooldowns.start(cooldown)
+                if raw_res:
+                    return r
+                if method == "GET":
+                    if cache_key is not None:
+                        self.cache.set(cache_key, r.content, self.cache.ttl_for(endpoint), r.headers.get('ETag'))
+                    return r.content or None
+                return body
+
+            except ThrottleException as te:
+                logging.info(te.message)
+                api_limiter.slow_down()
+                await asyncio.sleep(retry_delay(i, throttle_time, retry_after_hint(r.headers, te.data)))
+                continue
+
+            except ServerException as se:
+                logging.info(se.message)
+                api_limiter.slow_down()
+                await asyncio.sleep(retry_delay(i, throttle_time))
+                continue
+
+            except Exception:  # e.g. the connection failed, reported like an error of the API
+                logging.exception("Unable to call %s %s", method, endpoint)
+                return False
+
+        # If failed to make call after 10 tries fail it
+        raise TooManyTriesException
+
+    async def _gather_pages(self, list_method, key, limit, **kwargs):
+        """Fetches every page of a paginated endpoint. The first page is requested on its own to learn the total
+        from its meta, the remaining pages are then requested concurrently.
+
+        Parameters:
+            list_method (coroutine function): Paginated endpoint method taking `limit` and `page`
+            key (str): Key of the list in the dict returned by `list_method`
+            limit (int): How many entries to request per page
+
+        Returns:
+            list: The entries of every page in page order
+        """
+        first = await list_method(limit=limit, page=1, **kwargs)
+        if not first:
+            return False
+        pages = math.ceil(first['meta'].total / limit)
+        rest = await asyncio.gather(*(list_method(limit=limit, page=page, **kwargs) for page in range(2, pages + 1)))
+        result = list(first[key])
+        for res in rest:
+            if not res:
+                return False
+            result.extend(res[key])
+        return result
+
+
+class AsyncApi:
+    def __init__(self, username=None, token=None, max_concurrent=10, cache=None):
+        """Groups the async endpoint classes in the same way as `Api`. Use it as an async context manager so the
+        sessions get closed, e.g.
+
+            async with AsyncApi(token=TOKEN) as api:
+                contracts = await asyncio.gather(*(api.contracts.get_contract(i) for i in ids))
+
+        Parameters:
+            username (str): Username of the user
+            token (str): The personal auth token for the user
+            max_concurrent (int, optional): Concurrent request cap for each endpoint class. Defaults to 10.
+            cache (TTLCache, optional): Response cache shared by the endpoint classes. Defaults to None.
+        """
+        self.token = token
+        self.session = None
+        self.cache = cache
+        self.agent = AsyncAgent(token=token, max_concurrent=max_concurrent, cache=cache)
+        self.contracts = AsyncContracts(token=token, max_concurrent=max_concurrent, cache=cache)
+        self.faction = AsyncFaction(token=token, max_concurrent=max_concurrent, cache=cache)
+        self.fleet = AsyncFleet(token=token, max_concurrent=max_concurrent, cache=cache)
+        self.systems = AsyncSystems(token=token, max_concurrent=max_concurrent, cache=cache)
+
+    def _endpoints(self):
+        return self.agent, self.contracts, self.faction, self.fleet, self.systems
+
+    async def __aenter__(self):
+        # Created here rather than in __init__ so the connections belong to the event loop that uses them
+        self.session = new_session()
+        for endpoint in self._endpoints():
+            endpoint._session = self.session
+            endpoint._owns_session = False
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        """Closes the shared session and any sessions the endpoint classes created themselves"""
+        await asyncio.gather(*(endpoint.close() for endpoint in self._endpoints()))
+        if self.session is not None:
+            await self.session.aclose()
+            self.session = None
+
+
+class AsyncFleet(AsyncClient):
+    """Async versions of the ship status and extraction related Fleet endpoints"""
+
+    async def list_ships(self, limit=10, page=1, raw_res=False, throttle_time=10):
+        """Async version of `Fleet.list_ships`.
+
+        Returns:
+            dict:
+                ships (list[Ship]): List of ships you own.
+                meta (Meta): Meta object.
+        """
+        endpoint = f"my/ships"
+        check_page(limit, page)
+        querystring = {"page": page, "limit": limit}
+        warning_log = "Unable to get list of owned ships."
+        res = await self.generic_api_call("GET", endpoint, params=querystring, token=self.token,
+                                          warning_log=warning_log, raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
+        if not res:
+            return False
+        return {"ships": models.parser(res['data'], list[models.Ship]),
+                "meta": models.parser(res['meta'], models.Meta)}
+
+    async def list_all_ships(self, limit=20):
+        """Return all of your ships, fetching the pages after the first one concurrently.
+
+        Parameters:
+            limit (int, optional): How many entries to request per page. Defaults to 20.
+
+        Returns:
+            list[Ship]: List of ships.
+        """
+        return await self._gather_pages(self.list_ships, "ships", limit)
+
+    async def get_ship(self, ship_symbol, raw_res=False, throttle_time=10):
+        """Async version of `Fleet.get_ship`.
+
+        Returns:
+            Ship (Ship): Ship object.
+        """
+        endpoint = f"my/ships/{ship_symbol}"
+        warning_log = ("Unable to get info on ship: %s", ship_symbol)
+        res = await self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log,
+                                          raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
+        return models.parser(res['data'], models.Ship) if res else False
+
+    async def get_ship_cargo(self, ship_symbol, raw_res=False, throttle_time=10):
+        """Async version of `Fleet.get_ship_cargo`.
+
+        Returns:
+            ShipCargo: ShipCargo object.
+        """
+        endpoint = f"my/ships/{ship_symbol}/cargo"
+        warning_log = ("Unable to get info on ship cargo: %s", ship_symbol)
+        res = await self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log,
+                                          raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
+        return models.parser(res['data'], models.ShipCargo) if res else False
+
+    async def get_ship_cooldown(self, ship_symbol, raw_res=False, throttle_time=10):
+        """Async version of `Fleet.get_ship_cooldown`.
+
+        Returns:
+            Cooldown: Cooldown object.
+        """
+        endpoint = f"my/ships/{ship_symbol}/cooldown"
+        warning_log = ("Unable to get ship cooldown: %s", ship_symbol)
+        res = await self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log,
+                                          raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
+        return models.parser(res['data'], models.Cooldown) if res else False
+
+    async def get_ship_nav(self, ship_symbol, raw_res=False, throttle_time=10):
+        """Async version of `Fleet.get_ship_nav`.
+
+        Returns:
+            ShipNav: ShipNav object
+        """
+        endpoint = f"my/ships/{ship_symbol}/nav"
+        warning_log = ("Unable to get nav on ship: %s", ship_symbol)
+        res = await self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log,
+                                          raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
+        return models.parser(res['data'], models.ShipNav) if res else False
+
+    async def orbit_ship(self, ship_symbol, raw_res=False, throttle_time=10):
+        """Async version of `Fleet.orbit_ship`.
+
+        Returns:
+            ShipNav: ShipNav object
+        """
+        endpoint = f"my/ships/{ship_symbol}/orbit"
+        warning_log = ("Unable to orbit ship: %s", ship_symbol)
+        res = await self.generic_api_call("POST", endpoint, token=self.token, warning_log=warning_log,
+                                          raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
+        return models.parser(res['data']['nav'], models.ShipNav) if res else False
+
+    async def dock_ship(self, ship_symbol, raw_res=False, throttle_time=10):
+        """Async version of `Fleet.dock_ship`.
+
+        Returns:
+            ShipNav: ShipNav object
+        """
+        endpoint = f"my/ships/{ship_symbol}/dock"
+        warning_log = ("Unable to dock ship: %s", ship_symbol)
+        res = await self.generic_api_call("POST", endpoint, token=self.token, warning_log=warning_log,
+                                          raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
+        return models.parser(res['data']['nav'], models.ShipNav) if res else False
+
+    async def create_survey(self, ship_symbol, raw_res=False, throttle_time=10):
+        """Async version of `Fleet.create_survey`.
+
+        Returns:
+            dict:
+                cooldown (Cooldown): Cooldown object.
+                surveys (list[Survey]): List of surveys.
+        """
+        endpoint = f"my/ships/{ship_symbol}/survey"
+        warning_log = ("Unable to survey on ship: %s", ship_symbol)
+        res = await self.generic_api_call("POST", endpoint, token=self.token, warning_log=warning_log,
+                                          raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
+        if not res:
+            return False
+        data = res['data']
+        return {"cooldown": models.parser(data['cooldown'], models.Cooldown),
+                "surveys": models.parser(data['surveys'], list[models.Survey])}
+
+    async def extract_resources(self, ship_symbol, raw_res=False, throttle_time=10):
+        """Async version of `Fleet.extract_resources`.
+
+        Returns:
+            dict:
+                cooldown (Cooldown): Cooldown object.
+                extraction (dict):
+                    ship_symbol (str): Symbol of the ship that executed the extraction.
+                    yield (ExtractionYield): ExtractionYield object.
+                cargo (ShipCargo): ShipCargo object.
+                events (list[ShipConditionEvent]): List of events.
+        """
+        endpoint = f"my/ships/{ship_symbol}/extract"
+        warning_log = ("Unable to extract on ship: %s", ship_symbol)
+        res = await self.generic_api_call("POST", endpoint, token=self.token, warning_log=warning_log,
+                                          raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
+        if not res:
+            return False
+        data = res['data']
+        extraction = data['extraction']
+        return {"cooldown": models.parser(data['cooldown'], models.Cooldown),
+                "extraction": {"ship_symbol": extraction['shipSymbol'],
+                               "yield": models.parser(extraction['yield'], models.ExtractionYield)},
+                "cargo": models.parser(data['cargo'], models.ShipCargo),
+                "events": models.parser(data['events'], list[models.ShipConditionEvent])}
+
+    async def extract_resources_with_survey(self, ship_symbol, survey: models.Survey, raw_res=False,
+                                            throttle_time=10):
+        """Async version of `Fleet.extract_resources_with_survey`.
+
+        Returns:
+            dict:
+                cooldown (Cooldown): Cooldown object.
+                extraction (dict):
+                    ship_symbol (str): Symbol of the ship that executed the extraction.
+                    yield (ExtractionYield): ExtractionYield object.
+                cargo (ShipCargo): ShipCargo object.
+                events (list[ShipConditionEvent]): List of events.
+        """
+        endpoint = f"my/ships/{ship_symbol}/extract/survey"
+        warning_log = ("Unable to extract with survey on ship: %s", ship_symbol)
+        params = models.unpack(survey)
+        res = await self.generic_api_call("POST", endpoint, params=params, token=self.token, warning_log=warning_log,
+                                          raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
+        if not res:
+            return False
+        data = res['data']
+        extraction = data['extraction']
+        return {"cooldown": models.parser(data['cooldown'], models.Cooldown),
+                "extraction": {"ship_symbol": extraction['shipSymbol'],
+                               "yield": models.parser(extraction['yield'], models.ExtractionYield)},
+                "cargo": models.parser(data['cargo'], models.ShipCargo),
+                "events": models.parser(data['events'], list[models.ShipConditionEvent])}
+
+    async def scan_waypoints(self, ship_symbol, raw_res=False, throttle_time=10):
+        """Async version of `Fleet.scan_waypoints`.
+
+        Returns:
+            dict:
+                cooldown (Cooldown): Cooldown object
+                waypoints (list[Waypoint]): List of waypoints
+        """
+        endpoint = f"my/ships/{ship_symbol}/scan/waypoints"
+        warning_log = ("Failed to scan waypoints with ship (%s).", ship_symbol)
+        res = await self.generic_api_call("POST", endpoint, token=self.token, warning_log=warning_log,
+                                          raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
+        if not res:
+            return False
+        data = res['data']
+        return {"cooldown": models.parser(data['cooldown'], models.Cooldown),
+                "waypoints": models.parser(data['waypoints'], list[models.Waypoint])}
+
+    async def refuel_ship(self, ship_symbol, units, from_cargo=False, raw_res=False, throttle_time=10):
+        """Async version of `Fleet.refuel_ship`.
+
+        Returns:
+            dict:
+                agent (Agent): Agent object.
+                fuel (ShipFuel): ShipFuel object.
+                transaction (MarketTransaction): MarketTransaction object.
+        """
+        endpoint = f"my/ships/{ship_symbol}/refuel"
+        warning_log = ("Failed to refuel ship (%s).", ship_symbol)
+        params = {"units": units, "fromCargo": from_cargo}
+        res = await self.generic_api_call("POST", endpoint, params=params, token=self.token, warning_log=warning_log,
+                                          raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
+        if not res:
+            return False
+        data = res['data']
+        return {"agent": models.parser(data['agent'], models.Agent),
+                "fuel": models.parser(data['fuel'], models.ShipFuel),
+                "transaction": models.parser(data['transaction'], models.MarketTransaction)}
+
+    async def sell_cargo(self, ship_symbol, symbol, units, raw_res=False, throttle_time=10):
+        """Async version of `Fleet.sell_cargo`.
+
+        Returns:
+            dict:
+                agent (Agent): Agent object.
+                cargo (ShipCargo): ShipCargo object.
+                transaction (MarketTransaction): MarketTransaction object.
+        """
+        endpoint = f"my/ships/{ship_symbol}/sell"
+        warning_log = ("Unable to sell cargo from ship. Params - ship_symbol: %s, symbol: %s, units: %s",
+                       ship_symbol, symbol, units)
+        logging.info("Sell the following cargo from ship: %s, symbol: %s, units: %s", ship_symbol, symbol, units)
+        params = {"symbol": symbol, "units": units}
+        res = await self.generic_api_call("POST", endpoint, params=params, token=self.token, warning_log=warning_log,
+                                          raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
+        if not res:
+            return False
+        data = res['data']
+        return {"agent": models.parser(data['agent'], models.Agent),
+                "cargo": models.parser(data['cargo'], models.ShipCargo),
+                "transaction": models.parser(data['transaction'], models.MarketTransaction)}
+
+    async def purchase_cargo(self, ship_symbol, symbol, units, raw_res=False, throttle_time=10):
+        """Async version of `Fleet.purchase_cargo`.
+
+        Returns:
+            dict:
+                agent (Agent): Agent object.
+                cargo (ShipCargo): ShipCargo object.
+                transaction (MarketTransaction): MarketTransaction object.
+        """
+        endpoint = f"my/ships/{ship_symbol}/purchase"
+        warning_log = ("Unable to buy cargo from ship. Params - ship_symbol: %s, symbol: %s, units: %s",
+                       ship_symbol, symbol, units)
+        logging.info("Buy the following cargo from ship: %s, symbol: %s, units: %s", ship_symbol, symbol, units)
+        params = {"symbol": symbol, "units": units}
+        res = await self.generic_api_call("POST", endpoint, params=params, token=self.token, warning_log=warning_log,
+                                          raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
+        if not res:
+            return False
+        data = res['data']
+        return {"agent": models.parser(data['agent'], models.Agent),
+                "cargo": models.parser(data['cargo'], models.ShipCargo),
+                "transaction": models.parser(data['transaction'], models.MarketTransaction)}
+
+
+class AsyncSystems(AsyncClient):
+    """Async versions of the system, waypoint, market and shipyard related Systems endpoints"""
+
+    async def list_systems(self, limit=10, page=1, raw_res=False, throttle_time=10):
+        """Async version of `Systems.list_systems`.
+
+        Returns:
+            dict:
+                systems (list[System]): List of systems.
+                meta (Meta): Meta object.
+        """
+        endpoint = f"systems"
+        check_page(limit, page)
+        querystring = {"page": page, "limit": limit}
+        warning_log = "Unable to list systems"
+        res = await self.generic_api_call("GET", endpoint, params=querystring, token=self.token,
+                                          warning_log=warning_log, raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
+        if not res:
+            return False
+        return {"systems": models.parser(res['data'], list[models.System]),
+                "meta": models.parser(res['meta'], models.Meta)}
+
+    async def list_all_systems(self, limit=20):
+        """Return all systems, fetching the pages after the first one concurrently.
+
+        Parameters:
+            limit (int, optional): How many entries to request per page. Defaults to 20.
+
+        Returns:
+            list[System]: List of systems.
+        """
+        return await self._gather_pages(self.list_systems, "systems", limit)
+
+    async def list_waypoints_in_system(self, system_symbol, limit=10, page=1, traits=None, type=None, raw_res=False,
+                                       throttle_time=10):
+        """Async version of `Systems.list_waypoints_in_system`.
+
+        Returns:
+            dict:
+                waypoints (list[Waypoint]): List of waypoints in the system.
+                meta (Meta): Meta object.
+        """
+        endpoint = f"systems/{system_symbol}/waypoints"
+        warning_log = ("Unable to get the locations in the system: %s", system_symbol)
+        logging.info("Getting the locations in system: %s", system_symbol)
+        check_page(limit, page)
+        querystring = {"limit": limit, "page": page}
+        if traits is not None:
+            querystring["traits"] = traits
+        if type is not None:
+            querystring["type"] = type
+        res = await self.generic_api_call("GET", endpoint, params=querystring, token=self.token,
+                                          warning_log=warning_log, raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
+        if not res:
+            return False
+        return {"waypoints": models.parser(res['data'], list[models.Waypoint]),
+                "meta": models.parser(res['meta'], models.Meta)}
+
+    async def list_all_waypoints_in_system(self, system_symbol, traits=None, type=None, limit=20):
+        """Return all waypoints of a system, fetching the pages after the first one concurrently.
+
+        Parameters:
+            system_symbol (str): The system symbol
+            traits (str | list[str], optional): Only return waypoints with these traits. Defaults to None.
+            type (str, optional): Only return waypoints of this type. Defaults to None.
+            limit (int, optional): How many entries to request per page. Defaults to 20.
+
+        Returns:
+            list[Waypoint]: List of waypoints in the system.
+        """
+        return await self._gather_pages(self.list_waypoints_in_system, "waypoints", limit,
+                                        system_symbol=system_symbol, traits=traits, type=type)
+
+    async def get_market(self, system_symbol, waypoint_symbol, raw_res=False, throttle_time=10):
+        """Async version of `Systems.get_market`.
+
+        Returns:
+            Market: Market object.
+        """
+        endpoint = f"systems/{system_symbol}/waypoints/{waypoint_symbol}/market"
+        warning_log = ("Unable to get details of market: %s", waypoint_symbol)
+        logging.info("Fetching details of market: %s", waypoint_symbol)
+        res = await self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log,
+                                          raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
+        return models.parser(res['data'], models.Market) if res else False
+
+    async def get_shipyard(self, system_symbol, waypoint_symbol, raw_res=False, throttle_time=10):
+        """Async version of `Systems.get_shipyard`.
+
+        Returns:
+            Shipyard: Shipyard object.
+        """
+        endpoint = f"systems/{system_symbol}/waypoints/{waypoint_symbol}/shipyard"
+        warning_log = ("Unable to get details of shipyard: %s", waypoint_symbol)
+        logging.info("Fetching details of shipyard: %s", waypoint_symbol)
+        res = await self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log,
+                                          raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
+        return models.parser(res['data'], models.Shipyard) if res else False
+
+
+class AsyncAgent(AsyncClient):
+    """Async versions of the Agent endpoints that don't register a new agent"""
+
+    async def get_agent(self, raw_res=False, throttle_time=10):
+        """Async version of `Agent.get_agent`.
+
+        Returns:
+            Agent: Agent object
+        """
+        endpoint = f"my/agent"
+        warning_log = "Unable to retrieve agent details"
+        res = await self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log,
+                                          raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
+        return models.parser(res['data'], models.Agent) if res else False
+
+    async def list_agents(self, limit=10, page=1, raw_res=False, throttle_time=10):
+        """Async version of `Agent.list_agents`.
+
+        Returns:
+            dict:
+                agents (list[Agent]): List of agents.
+                meta (Meta): Meta object.
+        """
+        endpoint = f"agents"
+        check_page(limit, page)
+        querystring = {"page": page, "limit": limit}
+        warning_log = "Unable to list agents"
+        res = await self.generic_api_call("GET", endpoint, params=querystring, token=self.token,
+                                          warning_log=warning_log, raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
+        if not res:
+            return False
+        return {"agents": models.parser(res['data'], list[models.Agent]),
+                "meta": models.parser(res['meta'], models.Meta)}
+
+    async def list_all_agents(self, limit=20):
+        """Return all agents, fetching the pages after the first one concurrently.
+
+        Parameters:
+            limit (int, optional): How many entries to request per page. Defaults to 20.
+
+        Returns:
+            list[Agent]: List of agents.
+        """
+        return await self._gather_pages(self.list_agents, "agents", limit)
+
+    async def get_public_agent(self, agent_symbol, raw_res=False, throttle_time=10):
+        """Async version of `Agent.get_public_agent`.
+
+        Returns:
+            Agent: Agent object
+        """
+        endpoint = f"agents/" + agent_symbol
+        warning_log = "Unable to list agent"
+        res = await self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log,
+                                          raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
+        return models.parser(res['data'], models.Agent) if res else False
+
+
+class AsyncFaction(AsyncClient):
+    """Async versions of the Faction endpoints"""
+
+    async def list_factions(self, limit=10, page=1, raw_res=False, throttle_time=10):
+        """Async version of `Faction.list_factions`.
+
+        Returns:
+            dict:
+                factions (list[Faction]): List of factions.
+                meta (Meta): Meta object.
+        """
+        endpoint = f"factions"
+        check_page(limit, page)
+        querystring = {"page": page, "limit": limit}
+        warning_log = "Unable to list factions"
+        res = await self.generic_api_call("GET", endpoint, params=querystring, token=self.token,
+                                          warning_log=warning_log, raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
+        if not res:
+            return False
+        return {"factions": models.parser(res['data'], list[models.Faction]),
+                "meta": models.parser(res['meta'], models.Meta)}
+
+    async def list_all_factions(self, limit=20):
+        """Return all factions, fetching the pages after the first one concurrently.
+
+        Parameters:
+            limit (int, optional): How many entries to request per page. Defaults to 20.
+
+        Returns:
+            list[Faction]: List of factions.
+        """
+        return await self._gather_pages(self.list_factions, "factions", limit)
+
+    async def get_faction(self, faction_symbol, raw_res=False, throttle_time=10):
+        """Async version of `Faction.get_faction`.
+
+        Returns:
+            Faction: Faction object
+        """
+        endpoint = f"factions/" + faction_symbol
+        warning_log = "Unable to fetch faction"
+        res = await self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log,
+                                          raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
+        return models.parser(res['data'], models.Faction) if res else False
+
+
+class AsyncContracts(AsyncClient):
+    """Async versions of the contract endpoints"""
+
+    async def deliver_cargo_to_contract(self, ship_symbol, contract_id, trade_symbol, units, raw_res=False,
+                                        throttle_time=10):
+        """Async version of `Contracts.deliver_cargo_to_contract`.
+
+        Returns:
+            dict:
+                contract (Contract): Contract object.
+                cargo (ShipCargo): ShipCargo object.
+        """
+        endpoint = f"my/contracts/{contract_id}/deliver"
+        params = {'shipSymbol': ship_symbol,
+                  'tradeSymbol': trade_symbol,
+                  'units': units}
+        warning_log = ("Unable to deliver trade goods for contract: %s", contract_id)
+        res = await self.generic_api_call("POST", endpoint, params=params, token=self.token, warning_log=warning_log,
+                                          raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
+        if not res:
+            return False
+        data = res['data']
+        return {"contract": models.parser(data['contract'], models.Contract),
+                "cargo": models.parser(data['cargo'], models.ShipCargo)}
+
+    async def list_contracts(self, limit=10, page=1, raw_res=False, throttle_time=10):
+        """Async version of `Contracts.list_contracts`.
+
+        Returns:
+            dict:
+                contracts (list[Contract]): List of contracts.
+                meta (Meta): Meta object.
+        """
+        endpoint = f"my/contracts"
+        check_page(limit, page)
+        querystring = {"page": page, "limit": limit}
+        warning_log = "Unable to get a list contracts"
+        res = await self.generic_api_call("GET", endpoint, params=querystring, token=self.token,
+                                          warning_log=warning_log, raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
+        if not res:
+            return False
+        return {"contracts": models.parser(res['data'], list[models.Contract]),
+                "meta": models.parser(res['meta'], models.Meta)}
+
+    async def list_all_contracts(self, limit=20):
+        """Return all of your contracts, fetching the pages after the first one concurrently.
+
+        Parameters:
+            limit (int, optional): How many entries to request per page. Defaults to 20.
+
+        Returns:
+            list[Contract]: List of contracts.
+        """
+        return await self._gather_pages(self.list_contracts, "contracts", limit)
+
+    async def get_contract(self, contract_id, raw_res=False, throttle_time=10):
+        """Async version of `Contracts.get_contract`.
+
+        Returns:
+            Contract: Contract details.
+        """
+        endpoint = f"my/contracts/{contract_id}"
+        warning_log = ("Unable to get details of contract: %s", contract_id)
+        res = await self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log,
+                                          raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
+        return models.parser(res['data'], models.Contract) if res else False
+
+    async def accept_contract(self, contract_id, raw_res=False, throttle_time=10):
+        """Async version of `Contracts.accept_contract`.
+
+        Returns:
+            dict:
+                agent (Agent): Agent details.
+                contract (Contract): Contract details.
+        """
+        endpoint = f"my/contracts/{contract_id}/accept"
+        warning_log = ("Unable to accept contract: %s", contract_id)
+        res = await self.generic_api_call("POST", endpoint, token=self.token, warning_log=warning_log,
+                                          raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
+        if not res:
+            return False
+        data = res['data']
+        return {"agent": models.parser(data['agent'], models.Agent),
+                "contract": models.parser(data['contract'], models.Contract)}
+
+    async def fulfill_contract(self, contract_id, raw_res=False, throttle_time=10):
+        """Async version of `Contracts.fulfill_contract`.
+
+        Returns:
+            dict:
+                agent (Agent): Agent object.
+                contract (Contract): Contract object.
+        """
+        endpoint = f"my/contracts/{contract_id}/fulfill"
+        warning_log = ("Unable to fulfill contract: %s", contract_id)
+        res = await self.generic_api_call("POST", endpoint, token=self.token, warning_log=warning_log,
+                                          raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
+        if not res:
+            return False
+        data = res['data']
+        return {"agent": models.parser(data['agent'], models.Agent),
+                "contract": models.parser(data['contract'], models.Contract)}
+
+    @staticmethod
+    async def _or_false(call):
+        # A contract that still failed after every retry is reported as False, so the others' results aren't lost.
+        # Other exceptions are bugs and are raised.
+        try:
+            return await call
+        except (TooManyTriesException, httpx.TransportError):
+            logging.exception("Unable to update contract")
+            return False
+
+    async def accept_many(self, contract_ids, throttle_time=10):
+        """Accept several contracts concurrently. Sync code can run it with `asyncio.run`; the client can be
+        reused by later `asyncio.run` calls.
+
+        Parameters:
+            contract_ids (list[str]): IDs of the contracts to accept
+            throttle_time (int, optional): How long to wait before attempting call again. Defaults to 10.
+
+        Returns:
+            list[dict]: Result of `accept_contract` for each ID in the given order, False where it failed
+        """
+        return await asyncio.gather(*(self._or_false(self.accept_contract(contract_id, throttle_time=throttle_time))
+                                      for contract_id in contract_ids))
+
+    async def fulfill_many(self, contract_ids, throttle_time=10):
+        """Fulfill several contracts concurrently. Sync code can run it with `asyncio.run`; the client can be
+        reused by later `asyncio.run` calls.
+
+        Parameters:
+            contract_ids (list[str]): IDs of the contracts to fulfill
+            throttle_time (int, optional): How long to wait before attempting call again. Defaults to 10.
+
+        Returns:
+            list[dict]: Result of `fulfill_contract` for each ID in the given order, False where it failed
+        """
+        return await asyncio.gather(*(self._or_false(self.fulfill_contract(contract_id, throttle_time=throttle_time))
+                                      for contract_id in contract_ids))
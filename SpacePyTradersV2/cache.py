@@ -0,0 +1,169 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+def request_key(url, token, endpoint, params=None):
+    """Builds the cache key of a GET request from its endpoint and query parameters. The base URL and token are part
+    of it, so clients of different agents or servers sharing a cache never get each other's responses. List values,
+    e.g. several traits, become tuples so the key stays hashable."""
+    if not params:
+        return endpoint, url, token, ()
+    return endpoint, url, token, tuple(sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in params.items()))
+
+
+def invalidation_scope(endpoint):
+    """Returns the endpoint prefix whose cached responses a mutating request to `endpoint` may have made stale,
+    e.g. `my/contracts/123/accept` -> `my/contracts`"""
+    return "/".join(endpoint.split("/", 2)[:2])
+
+
+# Ship actions, by the endpoint path after the ship symbol, that trade at the ship's waypoint, and the last path
+# segment of the cached responses outside my/ they change
+trade_actions = {"sell": "market", "purchase": "market", "refuel": "market"}
+
+
+def invalidation_scopes(endpoint):
+    """Returns the cached responses a mutating request to `endpoint` may have made stale, as (prefix, last_segment)
+    pairs where a last_segment of None matches every endpoint under the prefix. Everything of the agent under my/
+    is included as nearly every action changes more than its own resource, e.g. delivering to a contract empties
+    the ship's cargo and negotiating one adds a contract. Requests outside my/ add their own scope, e.g. supplying a
+    construction site, and trades add the markets or shipyards they took place at."""
+    scopes = [("my/", None)]
+    if not endpoint.startswith("my/"):
+        scopes.append((invalidation_scope(endpoint), None))
+    if endpoint == "my/ships":  # buying a ship
+        scopes.append(("systems/", "shipyard"))
+    elif endpoint.startswith("my/ships/"):
+        parts = endpoint.split("/", 3)
+        if len(parts) == 4 and parts[3] in trade_actions:
+            scopes.append(("systems/", trade_actions[parts[3]]))
+    return scopes
+
+
+# Seconds to keep responses of endpoints, keyed by the endpoint's last path segment, whose data changes much faster
+# or slower than the rest: market prices move with every trade while jump gates never change. A ship's nav and
+# cooldown are polled until the ship arrives or its reactor is ready, so they are only kept long enough to spare
+# the requests of a tight polling loop.
+default_ttl_policies = {"market": 10, "construction": 10, "jump-gate": 600, "nav": 0.5, "cooldown": 0.5}
+
+
+class TTLCache:
+    def __init__(self, maxsize=1024, ttl=30, policies=None):
+        """Least recently used cache whose entries expire `ttl` seconds after being stored. Used by the clients to
+        cache responses of GET requests. Expired responses that came with an ETag are revalidated with a
+        conditional request, so an unchanged response costs the server a 304 without a body. The clients store the
+        encoded response bodies, so every hit is decoded into a fresh copy that callers are free to change.
+
+        Parameters:
+            maxsize (int, optional): How many responses to keep at most. Defaults to 1024.
+            ttl (float, optional): How many seconds an entry stays fresh. Defaults to 30.
+            policies (dict, optional): Seconds an entry stays fresh by the last path segment of its endpoint,
+                overriding `ttl`. Defaults to `default_ttl_policies`.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.policies = default_ttl_policies if policies is None else policies
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Returns the fresh value stored for `key` or None. Expired entries with an ETag are kept so they can be
+        revalidated, the others are dropped."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value, etag = entry
+            if expires <= time.monotonic():
+                if etag is None:
+                    del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def etag(self, key):
+        """Returns the ETag the server sent with the value stored for `key`, fresh or expired, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return None if entry is None else entry[2]
+
+    def ttl_for(self, endpoint):
+        """Returns how many seconds a response of `endpoint` stays fresh"""
+        return self.policies.get(endpoint.rsplit("/", 1)[-1], self.ttl)
+
+    def set(self, key, value, ttl=None, etag=None):
+        """Stores `value` for `key`, for `ttl` seconds if given otherwise the cache's default ttl. `etag` is the
+        server's ETag of the value, sent back on the next request for `key` once the value has expired."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value, etag)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def revalidate(self, key, ttl=None):
+        """Marks the value stored for `key` fresh again after the server answered 304 Not Modified, and returns it.
+        Returns None if the entry has been dropped meanwhile."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), entry[1], entry[2])
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def invalidate(self, prefix, url=None, token=None, last_segment=None):
+        """Drops every entry whose endpoint starts with `prefix`, only those of `url` and `token` if given, and only
+        those whose endpoint ends in `last_segment` if given"""
+        with self._lock:
+            for key in [key for key in self._entries
+                        if key[0].startswith(prefix) and (url is None or key[1:3] == (url, token))
+                        and (last_segment is None or key[0].rsplit("/", 1)[-1] == last_segment)]:
+                del self._entries[key]
+
+    def clear(self):
+        """Drops every entry"""
+        with self._lock:
+            self._entries.clear()
+
+
+class SingleFlight:
+    def __init__(self):
+        """Coalesces identical requests that are in flight at the same time: the first caller for a key makes the
+        request and every caller arriving before it has finished gets its result instead of making its own."""
+        self._calls = {}
+        self._tasks = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, call):
+        """Returns the result of `call()`, shared with any other thread calling with the same `key` meanwhile"""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            result = call()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    async def do_async(self, key, call):
+        """Async version of `do` for coroutine functions. Tasks belong to the running event loop, so an instance
+        must only be used from one loop."""
+        task = self._tasks.get(key)
+        if task is None:
+            task = self._tasks[key] = asyncio.ensure_future(call())
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        # Shielded so a caller being cancelled doesn't cancel the request for the others waiting on it
+        return await asyncio.shield(task)
@@ -1,13 +1,22 @@
-from asyncio.format_helpers import extract_stack
 import requests
 import logging
 import time
+from functools import lru_cache
 from SpacePyTradersV2 import models
-from dataclasses import dataclass, field
-import warnings
-from ratelimit import limits, sleep_and_retry
+from SpacePyTradersV2.cache import request_key, invalidation_scopes, SingleFlight
+from SpacePyTradersV2.throttle import api_limiter, retry_delay, retry_after_hint, cooldown_ship, ship_cooldowns
 import json
 
+try:  # orjson decodes the large market and shipyard responses much faster, the stdlib is the fallback
+    import orjson
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+except ImportError:
+    json_loads = json.loads
+
+    def json_dumps(obj):
+        return json.dumps(obj).encode()
+
 URL = "https://api.spacetraders.io/"
 V2_URL = "https://api.spacetraders.io/v2/"
 logging.basicConfig(format='%(asctime)s - %(levelname)s - %(thread)d - %(message)s', level=logging.INFO)
@@ -15,62 +24,95 @@ logging.basicConfig(format='%(asctime)s - %(levelname)s - %(thread)d - %(message
 
 # Custom Exceptions
 # ------------------------------------------
-@dataclass
 class ThrottleException(Exception):
-    data: field(default_factory=dict)
-    message: str = "Throttle limit was reached. Pausing to wait for throttle"
+    def __init__(self, data=None, message="Throttle limit was reached. Pausing to wait for throttle"):
+        super().__init__(message)
+        self.data = {} if data is None else data
+        self.message = message
 
 
-@dataclass
 class ServerException(Exception):
-    data: field(default_factory=dict)
-    message: str = "Server Error. Pausing before trying again"
+    def __init__(self, data=None, message="Server Error. Pausing before trying again"):
+        super().__init__(message)
+        self.data = {} if data is None else data
+        self.message = message
 
 
-@dataclass
 class TooManyTriesException(Exception):
-    message: str = "Has failed too many times to make API call. "
+    def __init__(self, message="Has failed too many times to make API call. "):
+        super().__init__(message)
+        self.message = message
+
+
+# Error codes of the API after which a call is retried, and the exception signalling the retry
+retry_exceptions = {42901: ThrottleException, 500: ServerException, 409: ServerException}
+
+
+# Shared by every sync client so threads asking for the same resource at the same time make a single request
+inflight_requests = SingleFlight()
+
+
+def new_session():
+    """Creates a requests session whose connections to the API are pooled and kept alive between calls"""
+    session = requests.Session()
+    session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=0))
+    return session
+
+
+# Keyword each HTTP method sends its params with: a query string, a JSON body or a form body
+param_keywords = {"GET": "params", "POST": "json", "PATCH": "json", "PUT": "data", "DELETE": "data"}
 
 
-@sleep_and_retry
-@limits(calls=2, period=1.2)
-def make_request(method, url, headers, params):
-    """Checks which method to use and then makes the actual request to Space Traders API
+def check_page(limit, page):
+    """Checks the pagination arguments of a list endpoint before any request is made, so an invalid page doesn't
+    cost a round trip only to be rejected by the API.
+
+    Exceptions:
+        ValueError: limit must be between 1 and 20 and page at least 1
+    """
+    if not 1 <= limit <= 20 or page < 1:
+        raise ValueError(f'Invalid pagination provided: limit={limit}, page={page}')
+
+
+@lru_cache(maxsize=32)
+def request_headers(token):
+    """Returns the headers of a request authorised with `token`. The dict is shared between calls with the same
+    token, so it must not be changed."""
+    return {'Authorization': 'Bearer ' + token, 'Accept': 'application/json', 'Content-Type': 'application/json'}
+
+
+def make_request(method, url, headers, params, session=None):
+    """Checks which method to use and then makes the actual request to Space Traders API. Waits for the shared rate
+    limiter first, so requests are spread out to 2 per 1.2 seconds across all clients.
 
     Parameters:
         method (str): The HTTP method to use
         url (str): The URL of the request
         headers (dict): the request headers holding the Auth
         params (dict): parameters of the request
+        session (requests.Session, optional): Session to send the request with so its connections get reused.
+            Defaults to None which sends a one-off request.
 
     Returns:
         Request: Returns the request
 
     Exceptions:
-        Exception: Invalid method - must be GET, POST, PUT or DELETE
+        ValueError: Invalid method - must be GET, POST, PUT, DELETE or PATCH
     """
-    # Convert params into proper JSON data
-    # params = None if params is None else json.dumps(params)
-    # Define the different HTTP methods
-    if method == "GET":
-        return requests.get(url, headers=headers, params=params)
-    elif method == "POST":
-        return requests.post(url, headers=headers, json=params)
-    elif method == "PUT":
-        return requests.put(url, headers=headers, data=params)
-    elif method == "DELETE":
-        return requests.delete(url, headers=headers, data=params)
-    elif method == "PATCH":
-        return requests.patch(url, headers=headers, json=params)
-
-    # If an Invalid method provided throw exception
-    if method not in ["GET", "POST", "PUT", "DELETE", "PATCH"]:
-        logging.exception(f'Invalid method provided: {method}')
-
-
-@dataclass
+    keyword = param_keywords.get(method)
+    if keyword is None:
+        raise ValueError(f'Invalid method provided: {method}')
+    http = requests if session is None else session
+    api_limiter.acquire()
+    if params is None:
+        return http.request(method, url, headers=headers)
+    if keyword == "json":  # encode the body ourselves, requests would use the stdlib
+        return http.request(method, url, headers=headers, data=json_dumps(params))
+    return http.request(method, url, headers=headers, **{keyword: params})
+
+
 class Client:
-    def __init__(self, username=None, token=None):
+    def __init__(self, username=None, token=None, session=None, cache=None):
         """The Client class handles all user interaction with the Space Traders API. 
         The class is initiated with the username and token of the user. 
         If the user does not provide a token the 'create_user' method will attempt to fire and create a user with the username provided. 
@@ -79,77 +121,146 @@ class Client:
         Parameters:
             username (str): Username of the user
             token (str): The personal auth token for the user. If None will invoke the 'create_user' method
+            session (requests.Session, optional): Session used for all requests so the connection to the API is
+                kept alive between calls. Defaults to None which creates a session owned by this client.
+            cache (TTLCache, optional): Cache for the responses of GET requests. Any other request drops the agent's
+                cached responses under my/, and those of its own scope and of the market or shipyard it traded at,
+                see `invalidation_scopes`. Defaults to None which disables caching.
         """
         self.username = username
         self.token = token
         self.url = V2_URL
+        self._owns_session = session is None
+        self.session = new_session() if session is None else session
+        self.cache = cache
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """Closes the client's session if it was created by the client"""
+        if self._owns_session:
+            self.session.close()
 
     def generic_api_call(self, method, endpoint, params=None, token=None, warning_log=None, raw_res=False,
                          throttle_time=10):
         """Function to make consolidate parameters to make an API call to the Space Traders API. 
         Handles any throttling or error returned by the Space Traders API. 
+        Actions of a ship that is still on cooldown are refused with False without making a request.
+        Identical GET requests made by other threads while one is in flight share its result.
 
         Parameters:
             method (str): The HTTP method to use. GET, POST, PUT or DELETE
             endpoint (str): The API endpoint
             params (dict, optional): Any params required for the endpoint. Defaults to None.
             token (str, optional): The token of the user. Defaults to None.
+            warning_log (str or tuple, optional): Message logged if the call fails. A tuple of a format string and
+                its arguments is only formatted when the call fails. Defaults to None.
             raw_res (bool, default = False): Returns the request response's JSON by default. Can be set to True to return the request response.
-            throttle_time (int, default = 10): Sets how long the wait time before attempting call again. Default is 10 seconds
+            throttle_time (int, default = 10): Longest wait before attempting the call again. The wait follows the
+                server's Retry-After hint when given, otherwise it doubles with every retry. Default is 10 seconds
 
         Returns:
-            Any: depends on the return from the API but likely JSON
+            Any: depends on the return from the API but likely JSON, False if the call failed
         """
-        headers = {
-            'Authorization': 'Bearer ' + token,
-            'Accept': 'application/json',
-            'Content-Type': 'application/json'
-        }
+        if method != "GET" or raw_res:
+            return self._api_call(method, endpoint, params, token, warning_log, raw_res, throttle_time)
+        key = request_key(self.url, token, endpoint, params)
+        res = inflight_requests.do(key, lambda: self._api_call(method, endpoint, params, token, warning_log,
+                                                              raw_res, throttle_time))
+        return json_loads(res) if isinstance(res, bytes) else res
+
+    def _api_call(self, method, endpoint, params, token, warning_log, raw_res, throttle_time):
+        # Makes the call for generic_api_call, which lets identical GET requests in flight share one call. Successful
+        # GETs return the encoded body, so each caller sharing it decodes its own copy
+        cooldown_symbol = cooldown_ship(method, endpoint)
+        if cooldown_symbol is not None:
+            remaining = ship_cooldowns.remaining(cooldown_symbol)
+            if remaining:  # the API would refuse the action, spare the request
+                logging.warning("Not calling %s %s, ship %s is on cooldown for another %.1f seconds",
+                                method, endpoint, cooldown_symbol, remaining)
+                return False
+        headers = request_headers(token)
+        cache_key = None
+        if self.cache is not None and not raw_res:
+            if method == "GET":
+                cache_key = request_key(self.url, token, endpoint, params)
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    return cached
+                etag = self.cache.etag(cache_key)
+                if etag is not None:  # ask the server to only send the response if it has changed
+                    headers = {**headers, 'If-None-Match': etag}
+            else:
+                for prefix, last_segment in invalidation_scopes(endpoint):
+                    self.cache.invalidate(prefix, self.url, token, last_segment)
         # Make the request to the Space Traders API
         for i in range(10):
             try:
-                r = make_request(method=method, url=self.url + endpoint, headers=headers, params=params)
+                r = make_request(method=method, url=self.url + endpoint, headers=headers, params=params,
+                                 session=self.session)
+                api_limiter.observe(r.headers.get('x-ratelimit-remaining'))
                 if r.status_code == 204:
                     return None
+                if r.status_code == 304 and cache_key is not None:
+                    cached = self.cache.revalidate(cache_key, self.cache.ttl_for(endpoint))
+                    if cached is not None:
+                        return cached
+                    headers = request_headers(token)  # dropped meanwhile, fetch it in full
+                    continue
                 # If an error returned from api 
-                if 'error' in r.json():
-                    error = r.json()
+                body = json_loads(r.content) if r.content else None
+                if body and 'error' in body:
+                    error = body
                     code = error['error']['code']
                     message = error['error']['message']
-                    logging.warning(
-                        f"An error has occurred when hitting: {r.request.method} {r.url} with parameters: {params}. Error: " + str(
-                            error))
+                    logging.warning("An error has occurred when hitting: %s %s with parameters: %s. Error: %s",
+                                    r.request.method, r.url, params, error)
 
-                    # If throttling error
-                    if code == 42901:
-                        raise ThrottleException(error)
-
-                    # Retry if server error
-                    if code == 500 or code == 409:
-                        raise ServerException(error)
+                    # Retry if throttling or server error
+                    retry_exception = retry_exceptions.get(code)
+                    if retry_exception is not None:
+                        raise retry_exception(error)
 
                     # Unknown handling for error
-                    logging.warning(warning_log)
-                    logging.exception(f"Something broke the script. Code: {code} Error Message: {message} ")
+                    if isinstance(warning_log, tuple):  # format the message only now that the call has failed
+                        logging.warning(*warning_log)
+                    else:
+                        logging.warning(warning_log)
+                    logging.exception("Something broke the script. Code: %s Error Message: %s ", code, message)
                     return False
                 # If successful return r
+                api_limiter.speed_up()
+                if cooldown_symbol is not None and body:
+                    cooldown = body['data'].get('cooldown')
+                    if cooldown:
+                        ship_cooldowns.start(cooldown)
                 if raw_res:
                     return r
-                else:
-                    return r.json()
+                if method == "GET":
+                    if cache_key is not None:
+                        self.cache.set(cache_key, r.content, self.cache.ttl_for(endpoint), r.headers.get('ETag'))
+                    return r.content or None
+                return body
 
             except ThrottleException as te:
                 logging.info(te.message)
-                time.sleep(throttle_time)
+                api_limiter.slow_down()
+                time.sleep(retry_delay(i, throttle_time, retry_after_hint(r.headers, te.data)))
                 continue
 
             except ServerException as se:
                 logging.info(se.message)
-                time.sleep(throttle_time)
+                api_limiter.slow_down()
+                time.sleep(retry_delay(i, throttle_time))
                 continue
 
-            except Exception as e:
-                return e
+            except Exception:  # e.g. the connection failed, reported like an error of the API
+                logging.exception("Unable to call %s %s", method, endpoint)
+                return False
 
         # If failed to make call after 10 tries fail it
         raise TooManyTriesException
@@ -174,14 +285,41 @@ class Fleet(Client):
                 meta (Meta): Meta object.
         """
         endpoint = f"my/ships"
+        check_page(limit, page)
         querystring = {"page": page, "limit": limit}
-        warning_log = f"Unable to get list of owned ships."
-        logging.info(f"Getting a list of owned ships")
+        warning_log = "Unable to get list of owned ships."
+        logging.info("Getting a list of owned ships")
         res = self.generic_api_call("GET", endpoint, params=querystring, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
-        ret = {"ships": models.parser(res['data'], list[models.Ship]),
-               "meta": models.parser(res['meta'], models.Meta)}
-        return ret if res else False
+        if raw_res:
+            return res
+        if not res:
+            return False
+        return {"ships": models.parser(res['data'], list[models.Ship]),
+                "meta": models.parser(res['meta'], models.Meta)}
+
+    def snapshot_all_ships(self, limit=20, throttle_time=10):
+        """Return every ship under your agent's ownership keyed by symbol. The ships are fetched a page at a time with
+        `list_ships`, so refreshing a fleet of N ships takes N / limit calls. Prefer it over calling `get_ship` for
+        each ship.
+
+        Parameters:
+            limit (int, optional): How many entries to request per page, at most 20. Defaults to 20.
+            throttle_time (int, optional): How long to wait before attempting call again. Defaults to 10.
+
+        Returns:
+            dict[str, Ship]: Ships by symbol or False if a page could not be fetched
+        """
+        ships = {}
+        page = 1
+        while True:
+            res = self.list_ships(limit=limit, page=page, throttle_time=throttle_time)
+            if not res:
+                return False
+            ships.update({ship.symbol: ship for ship in res['ships']})
+            if page * limit >= res['meta'].total:
+                return ships
+            page += 1
 
     def purchase_ship(self, ship_type, waypoint_symbol, raw_res=False, throttle_time=10):
         """Purchase a ship from a Shipyard. In order to use this function, a ship under your agent's ownership must
@@ -201,14 +339,18 @@ class Fleet(Client):
         """
         endpoint = f"my/ships"
         params = {"waypointSymbol": waypoint_symbol, "shipType": ship_type}
-        warning_log = f"Unable to buy ship type: {ship_type}, at waypoint: {waypoint_symbol}."
-        logging.debug(f"Buying ship of type: {ship_type} at waypoint: {waypoint_symbol}")
+        warning_log = ("Unable to buy ship type: %s, at waypoint: %s.", ship_type, waypoint_symbol)
+        logging.debug("Buying ship of type: %s at waypoint: %s", ship_type, waypoint_symbol)
         res = self.generic_api_call("POST", endpoint, params=params, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
-        ret = {"agent": models.parser(res['data']['agent'], models.Agent),
-               "ship": models.parser(res['data']['ship'], models.Ship),
-               "transaction": models.parser(res['data']['transaction'], models.ShipyardTransaction)}
-        return ret if res else False
+        if raw_res:
+            return res
+        if not res:
+            return False
+        data = res['data']
+        return {"agent": models.parser(data['agent'], models.Agent),
+                "ship": models.parser(data['ship'], models.Ship),
+                "transaction": models.parser(data['transaction'], models.ShipyardTransaction)}
 
     def get_ship(self, ship_symbol, raw_res=False, throttle_time=10):
         """Retrieve the details of a ship under your agent's ownership.
@@ -224,10 +366,12 @@ class Fleet(Client):
             Ship (Ship): Ship object.
         """
         endpoint = f"my/ships/{ship_symbol}"
-        warning_log = f"Unable to get info on ship: {ship_symbol}"
-        logging.info(f"Getting info on ship: {ship_symbol}")
+        warning_log = ("Unable to get info on ship: %s", ship_symbol)
+        logging.info("Getting info on ship: %s", ship_symbol)
         res = self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
         return models.parser(res['data'], models.Ship) if res else False
 
     def get_ship_cargo(self, ship_symbol, raw_res=False, throttle_time=10):
@@ -244,10 +388,12 @@ class Fleet(Client):
             dict: JSON response
         """
         endpoint = f"my/ships/{ship_symbol}/cargo"
-        warning_log = f"Unable to get info on ship cargo: {ship_symbol}"
-        logging.info(f"Getting info on ship cargo: {ship_symbol}")
+        warning_log = ("Unable to get info on ship cargo: %s", ship_symbol)
+        logging.info("Getting info on ship cargo: %s", ship_symbol)
         res = self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
         return models.parser(res['data'], models.ShipCargo) if res else False
 
     def orbit_ship(self, ship_symbol, raw_res=False, throttle_time=10):
@@ -265,9 +411,11 @@ class Fleet(Client):
             ShipNav: ShipNav object
         """
         endpoint = f"my/ships/{ship_symbol}/orbit"
-        warning_log = f"Unable to orbit ship: {ship_symbol}"
+        warning_log = ("Unable to orbit ship: %s", ship_symbol)
         res = self.generic_api_call("POST", endpoint, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
         return models.parser(res['data']['nav'], models.ShipNav) if res else False
 
     def ship_refine(self, ship_symbol, produce, raw_res=False, throttle_time=10):
@@ -291,14 +439,18 @@ class Fleet(Client):
         """
         endpoint = f"my/ships/{ship_symbol}/refine"
         params = {"produce": produce}
-        warning_log = f"Unable to produce on ship: {ship_symbol}"
+        warning_log = ("Unable to produce on ship: %s", ship_symbol)
         res = self.generic_api_call("POST", endpoint, params=params, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
-        ret = {"cargo": models.parser(res['data']['cargo'], models.ShipCargo),
-               "cooldown": models.parser(res['data']['cooldown'], models.Cooldown),
-               "produced": models.parser(res['data']['produced'], list[models.ShipRefineGood]),
-               "consumed": models.parser(res['data']['consumed'], list[models.ShipRefineGood])}
-        return ret if res else False
+        if raw_res:
+            return res
+        if not res:
+            return False
+        data = res['data']
+        return {"cargo": models.parser(data['cargo'], models.ShipCargo),
+                "cooldown": models.parser(data['cooldown'], models.Cooldown),
+                "produced": models.parser(data['produced'], list[models.ShipRefineGood]),
+                "consumed": models.parser(data['consumed'], list[models.ShipRefineGood])}
 
     def create_chart(self, ship_symbol, raw_res=False, throttle_time=10):
         """Command a ship to chart the waypoint at its current location.
@@ -316,12 +468,16 @@ class Fleet(Client):
                 waypoint (Waypoint): Waypoint object
         """
         endpoint = f"my/ships/{ship_symbol}/chart"
-        warning_log = f"Unable to chart on ship: {ship_symbol}"
+        warning_log = ("Unable to chart on ship: %s", ship_symbol)
         res = self.generic_api_call("POST", endpoint, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
-        ret = {"chart": models.parser(res['data']['chart'], models.Chart),
-               "waypoint": models.parser(res['data']['waypoint'], models.Waypoint)}
-        return ret if res else False
+        if raw_res:
+            return res
+        if not res:
+            return False
+        data = res['data']
+        return {"chart": models.parser(data['chart'], models.Chart),
+                "waypoint": models.parser(data['waypoint'], models.Waypoint)}
 
     def get_ship_cooldown(self, ship_symbol, raw_res=False, throttle_time=10):
         """Retrieve the details of your ship's reactor cooldown. Some actions such as activating your jump drive,
@@ -338,9 +494,11 @@ class Fleet(Client):
             dict: JSON response
         """
         endpoint = f"my/ships/{ship_symbol}/cooldown"
-        warning_log = f"Unable to get ship cooldown: {ship_symbol}"
+        warning_log = ("Unable to get ship cooldown: %s", ship_symbol)
         res = self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
         return models.parser(res['data'], models.Cooldown) if res else False
 
     def dock_ship(self, ship_symbol, raw_res=False, throttle_time=10):
@@ -358,9 +516,11 @@ class Fleet(Client):
             dict: JSON response
         """
         endpoint = f"my/ships/{ship_symbol}/dock"
-        warning_log = f"Unable to dock ship: {ship_symbol}"
+        warning_log = ("Unable to dock ship: %s", ship_symbol)
         res = self.generic_api_call("POST", endpoint, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
         return models.parser(res['data']['nav'], models.ShipNav) if res else False
 
     def create_survey(self, ship_symbol, raw_res=False, throttle_time=10):
@@ -381,12 +541,16 @@ class Fleet(Client):
                 surveys (list[Survey]): List of surveys.
         """
         endpoint = f"my/ships/{ship_symbol}/survey"
-        warning_log = f"Unable to survey on ship: {ship_symbol}"
+        warning_log = ("Unable to survey on ship: %s", ship_symbol)
         res = self.generic_api_call("POST", endpoint, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
-        ret = {"cooldown": models.parser(res['data']['cooldown'], models.Cooldown),
-               "surveys": models.parser(res['data']['surveys'], list[models.Survey])}
-        return ret if res else False
+        if raw_res:
+            return res
+        if not res:
+            return False
+        data = res['data']
+        return {"cooldown": models.parser(data['cooldown'], models.Cooldown),
+                "surveys": models.parser(data['surveys'], list[models.Survey])}
 
     def extract_resources(self, ship_symbol, raw_res=False, throttle_time=10):
         """Extract resources from a waypoint that can be extracted, such as asteroid fields, into your ship. Send an
@@ -409,16 +573,20 @@ class Fleet(Client):
                 events (list[ShipConditionEvent]): List of events.
         """
         endpoint = f"my/ships/{ship_symbol}/extract"
-        warning_log = f"Unable to extract on ship: {ship_symbol}"
+        warning_log = ("Unable to extract on ship: %s", ship_symbol)
         res = self.generic_api_call("POST", endpoint, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
-
-        ret = {"cooldown": models.parser(res['data']['cooldown'], models.Cooldown),
-               "extraction": {"ship_symbol": res['data']['extraction']['shipSymbol'],
-                              "yield": models.parser(res['data']['extraction']['yield'], models.ExtractionYield)},
-               "cargo": models.parser(res['data']['cargo'], models.ShipCargo),
-               "events": models.parser(res['data']['events'], list[models.ShipConditionEvent])}
-        return ret if res else False
+        if raw_res:
+            return res
+        if not res:
+            return False
+        data = res['data']
+        extraction = data['extraction']
+        return {"cooldown": models.parser(data['cooldown'], models.Cooldown),
+                "extraction": {"ship_symbol": extraction['shipSymbol'],
+                               "yield": models.parser(extraction['yield'], models.ExtractionYield)},
+                "cargo": models.parser(data['cargo'], models.ShipCargo),
+                "events": models.parser(data['events'], list[models.ShipConditionEvent])}
 
     def siphon_resources(self, ship_symbol, raw_res=False, throttle_time=10):
         """Siphon gases, such as hydrocarbon, from gas giants.
@@ -440,15 +608,20 @@ class Fleet(Client):
                 events (list[ShipConditionEvent]): List of events.
         """
         endpoint = f"my/ships/{ship_symbol}/siphon"
-        warning_log = f"Unable to siphon on ship: {ship_symbol}"
+        warning_log = ("Unable to siphon on ship: %s", ship_symbol)
         res = self.generic_api_call("POST", endpoint, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
-        ret = {"cooldown": models.parser(res['data']['cooldown'], models.Cooldown),
-               "siphon": {"ship_symbol": res['data']['siphon']['shipSymbol'],
-                          "yield": models.parser(res['data']['extraction']['yield'], models.ExtractionYield)},
-               "cargo": models.parser(res['data']['cargo'], models.ShipCargo),
-               "events": models.parser(res['data']['events'], list[models.ShipConditionEvent])}
-        return ret if res else False
+        if raw_res:
+            return res
+        if not res:
+            return False
+        data = res['data']
+        siphon = data['siphon']
+        return {"cooldown": models.parser(data['cooldown'], models.Cooldown),
+                "siphon": {"ship_symbol": siphon['shipSymbol'],
+                           "yield": models.parser(siphon['yield'], models.ExtractionYield)},
+                "cargo": models.parser(data['cargo'], models.ShipCargo),
+                "events": models.parser(data['events'], list[models.ShipConditionEvent])}
 
     def extract_resources_with_survey(self, ship_symbol, survey: models.Survey, raw_res=False, throttle_time=10):
         """Use a survey when extracting resources from a waypoint.
@@ -470,16 +643,21 @@ class Fleet(Client):
                 events (list[ShipConditionEvent]): List of events.
         """
         endpoint = f"my/ships/{ship_symbol}/extract/survey"
-        warning_log = f"Unable to extract with survey on ship: {ship_symbol}"
+        warning_log = ("Unable to extract with survey on ship: %s", ship_symbol)
         params = models.unpack(survey)
         res = self.generic_api_call("POST", endpoint, params=params, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
-        ret = {"cooldown": models.parser(res['data']['cooldown'], models.Cooldown),
-               "extraction": {"ship_symbol": res['data']['extraction']['shipSymbol'],
-                              "yield": models.parser(res['data']['extraction']['yield'], models.ExtractionYield)},
-               "cargo": models.parser(res['data']['cargo'], models.ShipCargo),
-               "events": models.parser(res['data']['events'], list[models.ShipConditionEvent])}
-        return ret if res else False
+        if raw_res:
+            return res
+        if not res:
+            return False
+        data = res['data']
+        extraction = data['extraction']
+        return {"cooldown": models.parser(data['cooldown'], models.Cooldown),
+                "extraction": {"ship_symbol": extraction['shipSymbol'],
+                               "yield": models.parser(extraction['yield'], models.ExtractionYield)},
+                "cargo": models.parser(data['cargo'], models.ShipCargo),
+                "events": models.parser(data['events'], list[models.ShipConditionEvent])}
 
     def jettison_cargo(self, ship_symbol, symbol, units, raw_res=False, throttle_time=10):
         """Jettison cargo from your ship's cargo hold.
@@ -497,14 +675,14 @@ class Fleet(Client):
             Cargo: Cargo object
         """
         endpoint = f"my/ships/{ship_symbol}/jettison"
-        warning_log = (
-            f"Unable to jettison cargo from ship. Params - ship_symbol: {ship_symbol}, symbol: {symbol}, "
-            f"units: {units}")
-        logging.info(
-            f"Jettison the following cargo from ship: {ship_symbol}, symbol: {symbol}, units: {units}")
+        warning_log = ("Unable to jettison cargo from ship. Params - ship_symbol: %s, symbol: %s, units: %s",
+                       ship_symbol, symbol, units)
+        logging.info("Jettison the following cargo from ship: %s, symbol: %s, units: %s", ship_symbol, symbol, units)
         params = {"symbol": symbol, "units": units}
         res = self.generic_api_call("POST", endpoint, params=params, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
         return models.parser(res['data']['cargo'], models.ShipCargo) if res else False
 
     def jump_ship(self, ship_symbol, waypoint_symbol, raw_res=False, throttle_time=10):
@@ -527,14 +705,18 @@ class Fleet(Client):
         """
         endpoint = f"my/ships/{ship_symbol}/jump"
         params = {"waypointSymbol": waypoint_symbol}
-        warning_log = f"Unable to jump ship: {ship_symbol}"
+        warning_log = ("Unable to jump ship: %s", ship_symbol)
         res = self.generic_api_call("POST", endpoint, params=params, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
-        ret = {"nav": models.parser(res['data']['nav'], models.ShipNav),
-               "cooldown": models.parser(res['data']['cooldown'], models.Cooldown),
-               "transaction": models.parser(res['data']['transaction'], models.MarketTransaction),
-               "agent": models.parser(res['data']['agent'], models.Agent)}
-        return ret if res else False
+        if raw_res:
+            return res
+        if not res:
+            return False
+        data = res['data']
+        return {"nav": models.parser(data['nav'], models.ShipNav),
+                "cooldown": models.parser(data['cooldown'], models.Cooldown),
+                "transaction": models.parser(data['transaction'], models.MarketTransaction),
+                "agent": models.parser(data['agent'], models.Agent)}
 
     def navigate_ship(self, ship_symbol, waypoint_symbol, raw_res=False, throttle_time=10):
         """Navigate to a target destination. The ship must be in orbit to use this function. The destination waypoint
@@ -557,13 +739,17 @@ class Fleet(Client):
         """
         endpoint = f"my/ships/{ship_symbol}/navigate"
         params = {"waypointSymbol": waypoint_symbol}
-        warning_log = f"Unable to navigate ship: {ship_symbol}"
+        warning_log = ("Unable to navigate ship: %s", ship_symbol)
         res = self.generic_api_call("POST", endpoint, params=params, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
-        ret = {"fuel": models.parser(res['data']['fuel'], models.ShipFuel),
-               "nav": models.parser(res['data']['nav'], models.ShipNav),
-               "events": models.parser(res['data']['events'], list[models.ShipConditionEvent])}
-        return ret if res else False
+        if raw_res:
+            return res
+        if not res:
+            return False
+        data = res['data']
+        return {"fuel": models.parser(data['fuel'], models.ShipFuel),
+                "nav": models.parser(data['nav'], models.ShipNav),
+                "events": models.parser(data['events'], list[models.ShipConditionEvent])}
 
     def patch_ship_nav(self, ship_symbol, flight_mode, raw_res=False, throttle_time=10):
         """Update the nav configuration of a ship.
@@ -581,9 +767,11 @@ class Fleet(Client):
         """
         endpoint = f"my/ships/{ship_symbol}/nav"
         params = {"flightMode": flight_mode}
-        warning_log = f"Unable to change flight mode on ship: {ship_symbol}"
+        warning_log = ("Unable to change flight mode on ship: %s", ship_symbol)
         res = self.generic_api_call("PATCH", endpoint, params=params, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
         return models.parser(res['data'], models.ShipNav) if res else False
 
     def get_ship_nav(self, ship_symbol, raw_res=False, throttle_time=10):
@@ -600,10 +788,12 @@ class Fleet(Client):
             ShipNav: ShipNav object
         """
         endpoint = f"my/ships/{ship_symbol}/nav"
-        warning_log = f"Unable to get nav on ship: {ship_symbol}"
-        logging.info(f"Getting nav on ship: {ship_symbol}")
+        warning_log = ("Unable to get nav on ship: %s", ship_symbol)
+        logging.info("Getting nav on ship: %s", ship_symbol)
         res = self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
         return models.parser(res['data'], models.ShipNav) if res else False
 
     def warp_ship(self, ship_symbol, waypoint_symbol, raw_res=False, throttle_time=10):
@@ -623,14 +813,18 @@ class Fleet(Client):
                 nav (ShipNav): ShipNav object.
         """
         endpoint = f"my/ships/{ship_symbol}/warp"
-        warning_log = f"Unable to warp ship {ship_symbol} to waypoint: {waypoint_symbol}"
-        logging.info(f"Warping ship {ship_symbol} to waypoint: {waypoint_symbol}")
+        warning_log = ("Unable to warp ship %s to waypoint: %s", ship_symbol, waypoint_symbol)
+        logging.info("Warping ship %s to waypoint: %s", ship_symbol, waypoint_symbol)
         params = {"waypointSymbol": waypoint_symbol}
         res = self.generic_api_call("POST", endpoint, params=params, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
-        ret = {"fuel": models.parser(res['data']['fuel'], models.ShipFuel),
-               "nav": models.parser(res['data']['nav'], models.ShipNav)}
-        return ret if res else False
+        if raw_res:
+            return res
+        if not res:
+            return False
+        data = res['data']
+        return {"fuel": models.parser(data['fuel'], models.ShipFuel),
+                "nav": models.parser(data['nav'], models.ShipNav)}
 
     def sell_cargo(self, ship_symbol, symbol, units, raw_res=False, throttle_time=10):
         """Sell cargo in your ship to a market that trades this cargo.
@@ -651,17 +845,20 @@ class Fleet(Client):
                 transaction (MarketTransaction): MarketTransaction object.
         """
         endpoint = f"my/ships/{ship_symbol}/sell"
-        warning_log = (
-            f"Unable to sell cargo from ship. Params - ship_symbol: {ship_symbol}, symbol: {symbol}, "
-            f"units: {units}")
-        logging.info(f"Sell the following cargo from ship: {ship_symbol}, symbol: {symbol}, units: {units}")
+        warning_log = ("Unable to sell cargo from ship. Params - ship_symbol: %s, symbol: %s, units: %s",
+                       ship_symbol, symbol, units)
+        logging.info("Sell the following cargo from ship: %s, symbol: %s, units: %s", ship_symbol, symbol, units)
         params = {"symbol": symbol, "units": units}
         res = self.generic_api_call("POST", endpoint, params=params, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
-        ret = {"agent": models.parser(res['data']['agent'], models.Agent),
-               "cargo": models.parser(res['data']['cargo'], models.ShipCargo),
-               "transaction": models.parser(res['data']['transaction'], models.MarketTransaction)}
-        return ret if res else False
+        if raw_res:
+            return res
+        if not res:
+            return False
+        data = res['data']
+        return {"agent": models.parser(data['agent'], models.Agent),
+                "cargo": models.parser(data['cargo'], models.ShipCargo),
+                "transaction": models.parser(data['transaction'], models.MarketTransaction)}
 
     def scan_systems(self, ship_symbol, raw_res=False, throttle_time=10):
         """Scan for nearby systems, retrieving information on the systems' distance from the ship and their waypoints.
@@ -677,12 +874,16 @@ class Fleet(Client):
                 systems (list[System]): List of systems
         """
         endpoint = f"my/ships/{ship_symbol}/scan/systems"
-        warning_log = f"Failed to scan systems with ship ({ship_symbol})."
+        warning_log = ("Failed to scan systems with ship (%s).", ship_symbol)
         res = self.generic_api_call("POST", endpoint, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
-        ret = {"cooldown": models.parser(res['data']['cooldown'], models.Cooldown),
-               "systems": models.parser(res['data']['systems'], list[models.ScannedSystem])}
-        return ret if res else False
+        if raw_res:
+            return res
+        if not res:
+            return False
+        data = res['data']
+        return {"cooldown": models.parser(data['cooldown'], models.Cooldown),
+                "systems": models.parser(data['systems'], list[models.ScannedSystem])}
 
     def scan_waypoints(self, ship_symbol, raw_res=False, throttle_time=10):
         """Scan for nearby waypoints, retrieving detailed information on each waypoint in range.
@@ -698,12 +899,16 @@ class Fleet(Client):
                 waypoints (list[Waypoint]): List of waypoints
         """
         endpoint = f"my/ships/{ship_symbol}/scan/waypoints"
-        warning_log = f"Failed to scan waypoints with ship ({ship_symbol})."
+        warning_log = ("Failed to scan waypoints with ship (%s).", ship_symbol)
         res = self.generic_api_call("POST", endpoint, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
-        ret = {"cooldown": models.parser(res['data']['cooldown'], models.Cooldown),
-               "waypoints": models.parser(res['data']['waypoints'], list[models.Waypoint])}
-        return ret if res else False
+        if raw_res:
+            return res
+        if not res:
+            return False
+        data = res['data']
+        return {"cooldown": models.parser(data['cooldown'], models.Cooldown),
+                "waypoints": models.parser(data['waypoints'], list[models.Waypoint])}
 
     def scan_ships(self, ship_symbol, raw_res=False, throttle_time=10):
         """Scan for nearby ships, retrieving information for all ships in range.
@@ -719,12 +924,16 @@ class Fleet(Client):
                 waypoints (list[Waypoint]): List of waypoints
         """
         endpoint = f"my/ships/{ship_symbol}/scan/ships"
-        warning_log = f"Failed to scan ships with ship ({ship_symbol})."
+        warning_log = ("Failed to scan ships with ship (%s).", ship_symbol)
         res = self.generic_api_call("POST", endpoint, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
-        ret = {"cooldown": models.parser(res['data']['cooldown'], models.Cooldown),
-               "ships": models.parser(res['data']['ships'], list[models.Ship])}
-        return ret if res else False
+        if raw_res:
+            return res
+        if not res:
+            return False
+        data = res['data']
+        return {"cooldown": models.parser(data['cooldown'], models.Cooldown),
+                "ships": models.parser(data['ships'], list[models.Ship])}
 
     def refuel_ship(self, ship_symbol, units, from_cargo=False, raw_res=False, throttle_time=10):
         """Refuel your ship by buying fuel from the local market.
@@ -741,14 +950,18 @@ class Fleet(Client):
                 transaction (MarketTransaction): MarketTransaction object.
         """
         endpoint = f"my/ships/{ship_symbol}/refuel"
-        warning_log = f"Failed to refuel ship ({ship_symbol})."
+        warning_log = ("Failed to refuel ship (%s).", ship_symbol)
         params = {"units": units, "fromCargo": from_cargo}
         res = self.generic_api_call("POST", endpoint, params=params, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
-        ret = {"agent": models.parser(res['data']['agent'], models.Agent),
-               "fuel": models.parser(res['data']['fuel'], models.ShipFuel),
-               "transaction": models.parser(res['data']['transaction'], models.MarketTransaction)}
-        return ret if res else False
+        if raw_res:
+            return res
+        if not res:
+            return False
+        data = res['data']
+        return {"agent": models.parser(data['agent'], models.Agent),
+                "fuel": models.parser(data['fuel'], models.ShipFuel),
+                "transaction": models.parser(data['transaction'], models.MarketTransaction)}
 
     def purchase_cargo(self, ship_symbol, symbol, units, raw_res=False, throttle_time=10):
         """Purchase cargo from a market.
@@ -769,17 +982,20 @@ class Fleet(Client):
                 transaction (MarketTransaction): MarketTransaction object.
         """
         endpoint = f"my/ships/{ship_symbol}/purchase"
-        warning_log = (
-            f"Unable to buy cargo from ship. Params - ship_symbol: {ship_symbol}, symbol: {symbol}, "
-            f"units: {units}")
-        logging.info(f"Buy the following cargo from ship: {ship_symbol}, symbol: {symbol}, units: {units}")
+        warning_log = ("Unable to buy cargo from ship. Params - ship_symbol: %s, symbol: %s, units: %s",
+                       ship_symbol, symbol, units)
+        logging.info("Buy the following cargo from ship: %s, symbol: %s, units: %s", ship_symbol, symbol, units)
         params = {"symbol": symbol, "units": units}
         res = self.generic_api_call("POST", endpoint, params=params, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
-        ret = {"agent": models.parser(res['data']['agent'], models.Agent),
-               "cargo": models.parser(res['data']['cargo'], models.ShipCargo),
-               "transaction": models.parser(res['data']['transaction'], models.MarketTransaction)}
-        return ret if res else False
+        if raw_res:
+            return res
+        if not res:
+            return False
+        data = res['data']
+        return {"agent": models.parser(data['agent'], models.Agent),
+                "cargo": models.parser(data['cargo'], models.ShipCargo),
+                "transaction": models.parser(data['transaction'], models.MarketTransaction)}
 
     # Transfer Cargo
     def transfer_cargo(self, origin_ship_symbol, trade_symbol, dest_ship_symbol, units, raw_res=False,
@@ -796,12 +1012,15 @@ class Fleet(Client):
             ShipCargo: The origin ship's cargo.
         """
         endpoint = f"my/ships/{origin_ship_symbol}/transfer"
-        warning_log = f"Unable to transfer {units} units of {trade_symbol} from ship: {origin_ship_symbol} to ship: {dest_ship_symbol}"
-        logging.info(
-            f"Transferring {units} units of {trade_symbol} from ship: {origin_ship_symbol} to ship: {dest_ship_symbol}")
+        warning_log = ("Unable to transfer %s units of %s from ship: %s to ship: %s",
+                       units, trade_symbol, origin_ship_symbol, dest_ship_symbol)
+        logging.info("Transferring %s units of %s from ship: %s to ship: %s",
+                     units, trade_symbol, origin_ship_symbol, dest_ship_symbol)
         params = {"tradeSymbol": trade_symbol, "units": units, "shipSymbol": dest_ship_symbol}
         res = self.generic_api_call("POST", endpoint, params=params, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
         return models.parser(res['data']['cargo'], models.ShipCargo) if res else False
 
     def negotiate_contract(self, ship_symbol, raw_res=False, throttle_time=10):
@@ -818,9 +1037,11 @@ class Fleet(Client):
             dict: JSON response
         """
         endpoint = f"my/ships/{ship_symbol}/negotiate/contract"
-        warning_log = f"Unable to negotiate contract"
+        warning_log = "Unable to negotiate contract"
         res = self.generic_api_call("POST", endpoint, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
         return models.parser(res['data'], models.Contract) if res else False
 
     def get_mounts(self, ship_symbol, raw_res=False, throttle_time=10):
@@ -837,10 +1058,12 @@ class Fleet(Client):
             list[ShipMount]: List of installed mounts.
         """
         endpoint = f"my/ships/{ship_symbol}/mounts"
-        warning_log = f"Unable to get mounts on ship: {ship_symbol}"
-        logging.info(f"Getting mounts on ship: {ship_symbol}")
+        warning_log = ("Unable to get mounts on ship: %s", ship_symbol)
+        logging.info("Getting mounts on ship: %s", ship_symbol)
         res = self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
         return models.parser(res['data'], list[models.ShipMount]) if res else False
 
     def install_mount(self, ship_symbol, symbol, raw_res=False, throttle_time=10):
@@ -863,14 +1086,18 @@ class Fleet(Client):
         """
         endpoint = f"my/ships/{ship_symbol}/mounts/install"
         params = {"symbol": symbol}
-        warning_log = f"Unable to install mount on ship: {ship_symbol}"
+        warning_log = ("Unable to install mount on ship: %s", ship_symbol)
         res = self.generic_api_call("POST", endpoint, params=params, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
-        ret = {"agent": models.parser(res['data']['agent'], models.Agent),
-               "mounts": models.parser(res['data']['mounts'], list[models.ShipMount]),
-               "cargo": models.parser(res['data']['cargo'], models.ShipCargo),
-               "transaction": models.parser(res['data']['transaction'], models.MarketTransaction)}
-        return ret if res else False
+        if raw_res:
+            return res
+        if not res:
+            return False
+        data = res['data']
+        return {"agent": models.parser(data['agent'], models.Agent),
+                "mounts": models.parser(data['mounts'], list[models.ShipMount]),
+                "cargo": models.parser(data['cargo'], models.ShipCargo),
+                "transaction": models.parser(data['transaction'], models.MarketTransaction)}
 
     def remove_mount(self, ship_symbol, symbol, raw_res=False, throttle_time=10):
         """Remove a mount from a ship.
@@ -892,14 +1119,18 @@ class Fleet(Client):
         """
         endpoint = f"my/ships/{ship_symbol}/mounts/remove"
         params = {"symbol": symbol}
-        warning_log = f"Unable to install mount on ship: {ship_symbol}"
+        warning_log = ("Unable to install mount on ship: %s", ship_symbol)
         res = self.generic_api_call("POST", endpoint, params=params, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
-        ret = {"agent": models.parser(res['data']['agent'], models.Agent),
-               "mounts": models.parser(res['data']['mounts'], list[models.ShipMount]),
-               "cargo": models.parser(res['data']['cargo'], models.ShipCargo),
-               "transaction": models.parser(res['data']['transaction'], models.MarketTransaction)}
-        return ret if res else False
+        if raw_res:
+            return res
+        if not res:
+            return False
+        data = res['data']
+        return {"agent": models.parser(data['agent'], models.Agent),
+                "mounts": models.parser(data['mounts'], list[models.ShipMount]),
+                "cargo": models.parser(data['cargo'], models.ShipCargo),
+                "transaction": models.parser(data['transaction'], models.MarketTransaction)}
 
     def get_scrap_ship(self, ship_symbol, raw_res=False, throttle_time=10):
         """Get the amount of value that will be returned when scrapping a ship.
@@ -915,9 +1146,11 @@ class Fleet(Client):
             RepairTransaction: RepairTransactionObject
         """
         endpoint = f"my/ships/{ship_symbol}/scrap"
-        warning_log = f"Unable to get scrap price: {ship_symbol}"
+        warning_log = ("Unable to get scrap price: %s", ship_symbol)
         res = self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
         return models.parser(res['data']['transaction'], models.RepairTransaction) if res else False
 
     def scrap_ship(self, ship_symbol, raw_res=False, throttle_time=10):
@@ -936,12 +1169,16 @@ class Fleet(Client):
                 transaction: RepairTransaction object.
         """
         endpoint = f"my/ships/{ship_symbol}/scrap"
-        warning_log = f"Unable to scrap ship: {ship_symbol}"
+        warning_log = ("Unable to scrap ship: %s", ship_symbol)
         res = self.generic_api_call("POST", endpoint, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
-        ret = {"agent": models.parser(res['data']['agent'], models.Agent),
-               "transaction": models.parser(res['data']['transaction'], models.RepairTransaction)}
-        return ret if res else False
+        if raw_res:
+            return res
+        if not res:
+            return False
+        data = res['data']
+        return {"agent": models.parser(data['agent'], models.Agent),
+                "transaction": models.parser(data['transaction'], models.RepairTransaction)}
 
     def get_repair_ship(self, ship_symbol, raw_res=False, throttle_time=10):
         """Get the cost of repairing a ship.
@@ -957,9 +1194,11 @@ class Fleet(Client):
             RepairTransaction: RepairTransactionObject
         """
         endpoint = f"my/ships/{ship_symbol}/repair"
-        warning_log = f"Unable to get repair price: {ship_symbol}"
+        warning_log = ("Unable to get repair price: %s", ship_symbol)
         res = self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
         return models.parser(res['data']['transaction'], models.RepairTransaction) if res else False
 
     def repair_ship(self, ship_symbol, raw_res=False, throttle_time=10):
@@ -979,13 +1218,17 @@ class Fleet(Client):
                 transaction: RepairTransaction object.
         """
         endpoint = f"my/ships/{ship_symbol}/repair"
-        warning_log = f"Unable to repair ship: {ship_symbol}"
+        warning_log = ("Unable to repair ship: %s", ship_symbol)
         res = self.generic_api_call("POST", endpoint, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
-        ret = {"agent": models.parser(res['data']['agent'], models.Agent),
-               "ship": models.parser(res['data']['ship'], models.Ship),
-               "transaction": models.parser(res['data']['transaction'], models.RepairTransaction)}
-        return ret if res else False
+        if raw_res:
+            return res
+        if not res:
+            return False
+        data = res['data']
+        return {"agent": models.parser(data['agent'], models.Agent),
+                "ship": models.parser(data['ship'], models.Ship),
+                "transaction": models.parser(data['transaction'], models.RepairTransaction)}
 
 
 class Systems(Client):
@@ -1008,13 +1251,17 @@ class Systems(Client):
                 meta (Meta): Meta object.
         """
         endpoint = f"systems"
+        check_page(limit, page)
         querystring = {"page": page, "limit": limit}
-        warning_log = f"Unable to list agents"
+        warning_log = "Unable to list agents"
         res = self.generic_api_call("GET", endpoint, params=querystring, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
-        ret = {"systems": models.parser(res['data'], list[models.System]),
-               "meta": models.parser(res['meta'], models.Meta)}
-        return ret if res else False
+        if raw_res:
+            return res
+        if not res:
+            return False
+        return {"systems": models.parser(res['data'], list[models.System]),
+                "meta": models.parser(res['meta'], models.Meta)}
 
     def get_system(self, system_symbol, raw_res=False, throttle_time=10):
         """Get the details of a system.
@@ -1028,10 +1275,12 @@ class Systems(Client):
             System: System object.
         """
         endpoint = f"systems/{system_symbol}"
-        warning_log = f"Unable to get the  system: {system_symbol}"
-        logging.info(f"Getting the system: {system_symbol}")
+        warning_log = ("Unable to get the  system: %s", system_symbol)
+        logging.info("Getting the system: %s", system_symbol)
         res = self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
         return models.parser(res['data'], models.System) if res else False
 
     def list_waypoints_in_system(self, system_symbol, limit=10, page=1, traits=None, type=None, raw_res=False,
@@ -1050,8 +1299,9 @@ class Systems(Client):
                 meta (Meta): Meta object.
         """
         endpoint = f"systems/{system_symbol}/waypoints"
-        warning_log = f"Unable to get the locations in the system: {system_symbol}"
-        logging.info(f"Getting the locations in system: {system_symbol}")
+        warning_log = ("Unable to get the locations in the system: %s", system_symbol)
+        logging.info("Getting the locations in system: %s", system_symbol)
+        check_page(limit, page)
         querystring = {"limit": limit, "page": page}
         if not traits is None:
             querystring["traits"] = traits
@@ -1059,9 +1309,38 @@ class Systems(Client):
             querystring["type"] = type
         res = self.generic_api_call("GET", endpoint, params=querystring, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
-        ret = {"waypoints": models.parser(res['data'], list[models.Waypoint]),
-               "meta": models.parser(res['meta'], models.Meta)}
-        return ret if res else False
+        if raw_res:
+            return res
+        if not res:
+            return False
+        return {"waypoints": models.parser(res['data'], list[models.Waypoint]),
+                "meta": models.parser(res['meta'], models.Meta)}
+
+    def iter_waypoints_in_system(self, system_symbol, traits=None, type=None, limit=20, throttle_time=10):
+        """Yield the waypoints of a system one at a time. Pages are only requested once the waypoints of the
+        previous page have been consumed, so a caller that stops early, e.g. after finding the first waypoint it
+        needs, saves the requests for the remaining pages.
+
+        Parameters:
+            system_symbol (str): The system symbol
+            traits (str | list[str], optional): Only yield waypoints with these traits. Defaults to None.
+            type (str, optional): Only yield waypoints of this type. Defaults to None.
+            limit (int, optional): How many entries to request per page, at most 20. Defaults to 20.
+            throttle_time (int, optional): How long to wait before attempting call again. Defaults to 10.
+
+        Yields:
+            Waypoint: Waypoint object. Stops early if a page could not be fetched.
+        """
+        page = 1
+        while True:
+            res = self.list_waypoints_in_system(system_symbol, limit=limit, page=page, traits=traits, type=type,
+                                                throttle_time=throttle_time)
+            if not res:
+                return
+            yield from res['waypoints']
+            if page * limit >= res['meta'].total:
+                return
+            page += 1
 
     def get_waypoint(self, system_symbol, waypoint_symbol, raw_res=False, throttle_time=10):
         """View the details of a waypoint.
@@ -1078,10 +1357,12 @@ class Systems(Client):
             waypoint: Waypoint object.
         """
         endpoint = f"systems/{system_symbol}/waypoints/{waypoint_symbol}"
-        warning_log = f"Unable to get details of waypoint: {waypoint_symbol}"
-        logging.info(f"Fetching details of waypoint: {waypoint_symbol}")
+        warning_log = ("Unable to get details of waypoint: %s", waypoint_symbol)
+        logging.info("Fetching details of waypoint: %s", waypoint_symbol)
         res = self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
         return models.parser(res['data'], models.Waypoint) if res else False
 
     def get_market(self, system_symbol, waypoint_symbol, raw_res=False, throttle_time=10):
@@ -1099,10 +1380,12 @@ class Systems(Client):
             Market: Market object.
         """
         endpoint = f"systems/{system_symbol}/waypoints/{waypoint_symbol}/market"
-        warning_log = f"Unable to get details of market: {waypoint_symbol}"
-        logging.info(f"Fetching details of market: {waypoint_symbol}")
+        warning_log = ("Unable to get details of market: %s", waypoint_symbol)
+        logging.info("Fetching details of market: %s", waypoint_symbol)
         res = self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
         return models.parser(res['data'], models.Market) if res else False
 
     def get_shipyard(self, system_symbol, waypoint_symbol, raw_res=False, throttle_time=10):
@@ -1120,10 +1403,12 @@ class Systems(Client):
             Shipyard: Shipyard object.
         """
         endpoint = f"systems/{system_symbol}/waypoints/{waypoint_symbol}/shipyard"
-        warning_log = f"Unable to get details of shipyard: {waypoint_symbol}"
-        logging.info(f"Fetching details of shipyard: {waypoint_symbol}")
+        warning_log = ("Unable to get details of shipyard: %s", waypoint_symbol)
+        logging.info("Fetching details of shipyard: %s", waypoint_symbol)
         res = self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
         return models.parser(res['data'], models.Shipyard) if res else False
 
     def get_jump_gate(self, system_symbol, waypoint_symbol, raw_res=False, throttle_time=10):
@@ -1141,10 +1426,12 @@ class Systems(Client):
             dict: JSON response
         """
         endpoint = f"systems/{system_symbol}/waypoints/{waypoint_symbol}/jump-gate"
-        warning_log = f"Unable to get details of jump gate: {waypoint_symbol}"
-        logging.info(f"Fetching details of jump gate: {waypoint_symbol}")
+        warning_log = ("Unable to get details of jump gate: %s", waypoint_symbol)
+        logging.info("Fetching details of jump gate: %s", waypoint_symbol)
         res = self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
         return models.parser(res['data'], models.JumpGate) if res else False
 
     def get_construction_site(self, system_symbol, waypoint_symbol, raw_res=False, throttle_time=10):
@@ -1160,10 +1447,12 @@ class Systems(Client):
             dict: JSON response
         """
         endpoint = f"systems/{system_symbol}/waypoints/{waypoint_symbol}/construction"
-        warning_log = f"Unable to get details of construction site: {waypoint_symbol}"
-        logging.info(f"Fetching details of construction site: {waypoint_symbol}")
+        warning_log = ("Unable to get details of construction site: %s", waypoint_symbol)
+        logging.info("Fetching details of construction site: %s", waypoint_symbol)
         res = self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
         return models.parser(res['data'], models.Construction) if res else False
 
     def supply_construction_site(self, system_symbol, waypoint_symbol, ship_symbol, trade_symbol, units, raw_res=False,
@@ -1183,24 +1472,43 @@ class Systems(Client):
                 cargo (ShipCargo): ShipCargo object.
         """
         endpoint = f"systems/{system_symbol}/waypoints/{waypoint_symbol}/construction/supply"
-        warning_log = f"Unable to get the locations in the system: {system_symbol}"
-        logging.info(f"Getting the locations in system: {system_symbol}")
+        warning_log = ("Unable to get the locations in the system: %s", system_symbol)
+        logging.info("Getting the locations in system: %s", system_symbol)
         querystring = {"shipSymbol": ship_symbol, "tradeSymbol": trade_symbol, "units": units}
         res = self.generic_api_call("POST", endpoint, params=querystring, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
-        ret = {"construction": models.parser(res['data']['construction'], models.Construction),
-               "cargo": models.parser(res['data']['cargo'], models.ShipCargo)}
-        return ret if res else False
+        if raw_res:
+            return res
+        if not res:
+            return False
+        data = res['data']
+        return {"construction": models.parser(data['construction'], models.Construction),
+                "cargo": models.parser(data['cargo'], models.ShipCargo)}
 
 
 class Api:
-    def __init__(self, username=None, token=None):
+    def __init__(self, username=None, token=None, cache=None, session=None):
         self.token = token
-        self.agent = Agent(token=token)
-        self.contracts = Contracts(token=token)
-        self.faction = Faction(token=token)
-        self.fleet = Fleet(token=token)
-        self.systems = Systems(token=token)
+        # One session shared by every endpoint class so they all reuse the same pooled connections
+        self._owns_session = session is None
+        self.session = new_session() if session is None else session
+        self.cache = cache
+        self.agent = Agent(token=token, session=self.session, cache=cache)
+        self.contracts = Contracts(token=token, session=self.session, cache=cache)
+        self.faction = Faction(token=token, session=self.session, cache=cache)
+        self.fleet = Fleet(token=token, session=self.session, cache=cache)
+        self.systems = Systems(token=token, session=self.session, cache=cache)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """Closes the shared session if it was created by the Api"""
+        if self._owns_session:
+            self.session.close()
 
 
 class Agent(Client):
@@ -1221,9 +1529,11 @@ class Agent(Client):
             Agent: Agent object
         """
         endpoint = f"my/agent"
-        warning_log = f"Unable to retrieve agent details"
+        warning_log = "Unable to retrieve agent details"
         res = self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
         return models.parser(res['data'], models.Agent) if res else False
 
     def list_agents(self, limit=10, page=1, raw_res=False, throttle_time=10):
@@ -1243,13 +1553,17 @@ class Agent(Client):
                 meta (Meta): Meta object.
         """
         endpoint = f"agents"
+        check_page(limit, page)
         querystring = {"page": page, "limit": limit}
-        warning_log = f"Unable to list agents"
+        warning_log = "Unable to list agents"
         res = self.generic_api_call("GET", endpoint, params=querystring, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
-        ret = {"agents": models.parser(res['data'], list[models.Agent]),
-               "meta": models.parser(res['meta'], models.Meta)}
-        return ret if res else False
+        if raw_res:
+            return res
+        if not res:
+            return False
+        return {"agents": models.parser(res['data'], list[models.Agent]),
+                "meta": models.parser(res['meta'], models.Meta)}
 
     def get_public_agent(self, agent_symbol, raw_res=False, throttle_time=10):
         """Fetch agent details.
@@ -1265,9 +1579,11 @@ class Agent(Client):
             Agent: Agent object
         """
         endpoint = f"agents/" + agent_symbol
-        warning_log = f"Unable to list agent"
+        warning_log = "Unable to list agent"
         res = self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
         return models.parser(res['data'], models.Agent) if res else False
 
     def register_new_agent(self, symbol, faction, raw_res=False, throttle_time=10):
@@ -1288,19 +1604,23 @@ class Agent(Client):
                 token (str): A Bearer token for accessing secured API endpoints.
         """
         endpoint = f"register"
-        warning_log = f"Unable to register new agent"
+        warning_log = "Unable to register new agent"
         params = {
             'symbol': symbol,
             'faction': faction
         }
         res = self.generic_api_call("POST", endpoint, token="", warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time, params=params)
-        ret = {"agent": models.parser(res['data']['agent'], models.Agent),
-               "contract": models.parser(res['data']['contract'], models.Contract),
-               "faction": models.parser(res['data']['faction'], models.Faction),
-               "ship": models.parser(res['data']['ship'], models.Ship),
-               "token": res['data']['token']}
-        return ret if res else False
+        if raw_res:
+            return res
+        if not res:
+            return False
+        data = res['data']
+        return {"agent": models.parser(data['agent'], models.Agent),
+                "contract": models.parser(data['contract'], models.Contract),
+                "faction": models.parser(data['faction'], models.Faction),
+                "ship": models.parser(data['ship'], models.Ship),
+                "token": data['token']}
 
 
 class Faction(Client):
@@ -1324,13 +1644,17 @@ class Faction(Client):
                 meta (Meta): Meta object.
         """
         endpoint = f"factions"
+        check_page(limit, page)
         querystring = {"page": page, "limit": limit}
-        warning_log = f"Unable to list factions"
+        warning_log = "Unable to list factions"
         res = self.generic_api_call("GET", endpoint, params=querystring, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
-        ret = {"factions": models.parser(res['data'], list[models.Faction]),
-               "meta": models.parser(res['meta'], models.Meta)}
-        return ret if res else False
+        if raw_res:
+            return res
+        if not res:
+            return False
+        return {"factions": models.parser(res['data'], list[models.Faction]),
+                "meta": models.parser(res['meta'], models.Meta)}
 
     def get_faction(self, faction_symbol, raw_res=False, throttle_time=10):
         """View the details of a faction.
@@ -1346,9 +1670,11 @@ class Faction(Client):
             Faction: Faction object
         """
         endpoint = f"factions/" + faction_symbol
-        warning_log = f"Unable to fetch faction"
+        warning_log = "Unable to fetch faction"
         res = self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
         return models.parser(res['data'], models.Faction) if res else False
 
 
@@ -1377,12 +1703,16 @@ class Contracts(Client):
         params = {'shipSymbol': ship_symbol,
                   'tradeSymbol': trade_symbol,
                   'units': units}
-        warning_log = f"Unable to deliver trade goods for contract: {contract_id}"
+        warning_log = ("Unable to deliver trade goods for contract: %s", contract_id)
         res = self.generic_api_call("POST", endpoint, params=params, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
-        ret = {"contract": models.parser(res['data']['contract'], models.Contract),
-               "cargo": models.parser(res['data']['cargo'], models.ShipCargo)}
-        return ret if res else False
+        if raw_res:
+            return res
+        if not res:
+            return False
+        data = res['data']
+        return {"contract": models.parser(data['contract'], models.Contract),
+                "cargo": models.parser(data['cargo'], models.ShipCargo)}
 
     def list_contracts(self, limit=10, page=1, raw_res=False, throttle_time=10):
         """Return a paginated list of all your contracts.
@@ -1401,13 +1731,17 @@ class Contracts(Client):
                 meta (Meta): Meta object.
         """
         endpoint = f"my/contracts"
+        check_page(limit, page)
         querystring = {"page": page, "limit": limit}
-        warning_log = f"Unable to get a list contracts"
+        warning_log = "Unable to get a list contracts"
         res = self.generic_api_call("GET", endpoint, params=querystring, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
-        ret = {"contracts": models.parser(res['data'], list[models.Contract]),
-               "meta": models.parser(res['meta'], models.Meta)}
-        return ret if res else False
+        if raw_res:
+            return res
+        if not res:
+            return False
+        return {"contracts": models.parser(res['data'], list[models.Contract]),
+                "meta": models.parser(res['meta'], models.Meta)}
 
     def get_contract(self, contract_id, raw_res=False, throttle_time=10):
         """Get the details of a contract by ID.
@@ -1423,9 +1757,11 @@ class Contracts(Client):
             Contract: Contract details.
         """
         endpoint = f"my/contracts/{contract_id}"
-        warning_log = f"Unable to get details of contract: {contract_id}"
+        warning_log = ("Unable to get details of contract: %s", contract_id)
         res = self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
+        if raw_res:
+            return res
         return models.parser(res['data'], models.Contract) if res else False
 
     def accept_contract(self, contract_id, raw_res=False, throttle_time=10):
@@ -1444,12 +1780,16 @@ class Contracts(Client):
                 contract (Contract): Contract details.
         """
         endpoint = f"my/contracts/{contract_id}/accept"
-        warning_log = f"Unable to accept contract: {contract_id}"
+        warning_log = ("Unable to accept contract: %s", contract_id)
         res = self.generic_api_call("POST", endpoint, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
-        ret = {"agent": models.parser(res['data']['agent'], models.Agent),
-               "contract": models.parser(res['data']['contract'], models.Contract)}
-        return ret if res else False
+        if raw_res:
+            return res
+        if not res:
+            return False
+        data = res['data']
+        return {"agent": models.parser(data['agent'], models.Agent),
+                "contract": models.parser(data['contract'], models.Contract)}
 
     def fulfill_contract(self, contract_id, raw_res=False, throttle_time=10):
         """Fulfill a contract. Can only be used on contracts that have all of their delivery terms fulfilled.
@@ -1467,9 +1807,13 @@ class Contracts(Client):
                 contract (Contract): Contract object.
         """
         endpoint = f"my/contracts/{contract_id}/fulfill"
-        warning_log = f"Unable to fulfill contract: {contract_id}"
+        warning_log = ("Unable to fulfill contract: %s", contract_id)
         res = self.generic_api_call("POST", endpoint, token=self.token, warning_log=warning_log,
                                     raw_res=raw_res, throttle_time=throttle_time)
-        ret = {"agent": models.parser(res['data']['agent'], models.Agent),
-               "contract": models.parser(res['data']['contract'], models.Contract)}
-        return ret if res else False
+        if raw_res:
+            return res
+        if not res:
+            return False
+        data = res['data']
+        return {"agent": models.parser(data['agent'], models.Agent),
+                "contract": models.parser(data['contract'], models.Contract)}
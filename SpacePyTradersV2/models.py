@@ -1,8 +1,8 @@
-from dataclasses import dataclass, field, fields
-import re
+from dataclasses import dataclass, field, fields, is_dataclass, MISSING
+from functools import lru_cache
 
 
-@dataclass
+@dataclass(slots=True)
 class User:
     """
     The basic user object. Great way to store and access a user's credits, ships and loans.
@@ -17,10 +17,10 @@ class User:
     """
     username: str
     credits: int
-    ships: field(default_factory=list)
+    ships: list = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class Agent:
     symbol: str
     headquarters: str
@@ -30,28 +30,28 @@ class Agent:
     account_id: str = None  # optional
 
 
-@dataclass
+@dataclass(slots=True)
 class Chart:
     waypoint_symbol: str = None  # optional
     submitted_by: str = None
     submitted_on: str = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ConstructionMaterial:
     trade_symbol: str
     required: int
     fulfilled: int
 
 
-@dataclass
+@dataclass(slots=True)
 class Construction:
     symbol: str
     materials: list[ConstructionMaterial]
     is_complete: bool
 
 
-@dataclass
+@dataclass(slots=True)
 class ContractDeliverGood:
     trade_symbol: str
     destination_symbol: str
@@ -59,20 +59,20 @@ class ContractDeliverGood:
     units_fulfilled: int
 
 
-@dataclass
+@dataclass(slots=True)
 class ContractPayment:
     on_accepted: int
     on_fulfilled: int
 
 
-@dataclass
+@dataclass(slots=True)
 class ContractTerms:
     deadline: str
     payment: ContractPayment
     deliver: list[ContractDeliverGood]
 
 
-@dataclass
+@dataclass(slots=True)
 class Contract:
     id: str
     faction_symbol: str
@@ -84,7 +84,7 @@ class Contract:
     deadline_to_accept: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Cooldown:
     ship_symbol: str
     total_seconds: int
@@ -92,25 +92,25 @@ class Cooldown:
     expiration: str = None  # optional
 
 
-@dataclass
+@dataclass(slots=True)
 class ExtractionYield:  # No Extraction schema due to yield being a keyword
     symbol: str
     units: int
 
 
-@dataclass
+@dataclass(slots=True)
 class FactionSymbol:
     symbol: str
 
 
-@dataclass
+@dataclass(slots=True)
 class FactionTrait:
     symbol: str
     name: str
     description: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Faction:
     symbol: str
     name: str
@@ -120,20 +120,20 @@ class Faction:
     is_recruiting: bool
 
 
-@dataclass
+@dataclass(slots=True)
 class JumpGate:
     symbol: str
     connections: list[str]
 
 
-@dataclass
+@dataclass(slots=True)
 class TradeGood:  # WaypointModifier, WaypointTrait, and TradeGood share the same structure
     symbol: str
     name: str
     description: str
 
 
-@dataclass
+@dataclass(slots=True)
 class MarketTradeGood:
     symbol: str
     type: str
@@ -144,7 +144,7 @@ class MarketTradeGood:
     activity: str = None  # optional
 
 
-@dataclass
+@dataclass(slots=True)
 class MarketTransaction:
     waypoint_symbol: str
     ship_symbol: str
@@ -156,7 +156,7 @@ class MarketTransaction:
     timestamp: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Market:
     symbol: str
     exports: list[TradeGood]
@@ -166,21 +166,21 @@ class Market:
     trade_goods: list[MarketTradeGood] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class WaypointModifier:  # WaypointModifier, WaypointTrait, and TradeGood share the same structure
     symbol: str
     name: str
     description: str
 
 
-@dataclass
+@dataclass(slots=True)
 class WaypointTrait:  # WaypointModifier, WaypointTrait, and TradeGood share the same structure
     symbol: str
     name: str
     description: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Waypoint:
     symbol: str
     type: str
@@ -195,13 +195,13 @@ class Waypoint:
     orbits: str = None  # optional
 
 
-@dataclass
+@dataclass(slots=True)
 class Meta:  # for pagination
     total: int
     page: int
     limit: int
 
-@dataclass
+@dataclass(slots=True)
 class RepairTransaction:
     waypoint_symbol: str
     ship_symbol: str
@@ -209,7 +209,7 @@ class RepairTransaction:
     timestamp: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ScannedSystem:
     symbol: str
     type: str
@@ -219,7 +219,7 @@ class ScannedSystem:
     sectorSymbol: str = None  # optional
 
 
-@dataclass
+@dataclass(slots=True)
 class ShipCargoItem:
     symbol: str
     name: str
@@ -227,7 +227,7 @@ class ShipCargoItem:
     units: int
 
 
-@dataclass
+@dataclass(slots=True)
 class ShipConditionEvent:
     symbol: str
     component: str
@@ -235,14 +235,14 @@ class ShipConditionEvent:
     description: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ShipCargo:
     capacity: int
     units: int
     inventory: list[ShipCargoItem]
 
 
-@dataclass
+@dataclass(slots=True)
 class ShipCrew:
     required: int
     capacity: int
@@ -252,20 +252,20 @@ class ShipCrew:
     wages: int = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ShipRefineGood:
     trade_symbol: str
     units: int
 
 
-@dataclass
+@dataclass(slots=True)
 class ShipRequirements:
     crew: int
     power: int = None  # optional
     slots: int = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ShipEngine:
     symbol: str
     name: str
@@ -276,7 +276,7 @@ class ShipEngine:
     requirements: ShipRequirements
 
 
-@dataclass
+@dataclass(slots=True)
 class ShipFrame:
     symbol: str
     name: str
@@ -289,20 +289,20 @@ class ShipFrame:
     requirements: ShipRequirements
 
 
-@dataclass
+@dataclass(slots=True)
 class ShipFuelConsumed:
     amount: int
     timestamp: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ShipFuel:
     current: int
     capacity: int
     consumed: ShipFuelConsumed  # optional
 
 
-@dataclass
+@dataclass(slots=True)
 class ShipModule:
     symbol: str
     name: str
@@ -312,7 +312,7 @@ class ShipModule:
     range: int = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ShipMount:
     symbol: str
     name: str
@@ -322,7 +322,7 @@ class ShipMount:
     deposits: list[str] = None  # optional field, + look at this again
 
 
-@dataclass
+@dataclass(slots=True)
 class ShipNavRouteWaypoint:
     symbol: str
     type: str
@@ -331,7 +331,7 @@ class ShipNavRouteWaypoint:
     y: int
 
 
-@dataclass
+@dataclass(slots=True)
 class ShipNavRoute:
     destination: ShipNavRouteWaypoint
     origin: ShipNavRouteWaypoint
@@ -339,7 +339,7 @@ class ShipNavRoute:
     arrival: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ShipNav:
     system_symbol: str
     waypoint_symbol: str
@@ -348,7 +348,7 @@ class ShipNav:
     flight_mode: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ShipReactor:
     symbol: str
     name: str
@@ -359,14 +359,14 @@ class ShipReactor:
     requirements: ShipRequirements
 
 
-@dataclass
+@dataclass(slots=True)
 class ShipRegistration:
     name: str
     faction_symbol: str
     role: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Ship:
     symbol: str
     registration: ShipRegistration
@@ -382,12 +382,12 @@ class Ship:
     fuel: ShipFuel = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ShipTypes:
     type: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ShipyardTransaction:
     waypoint_symbol: str
     ship_symbol: str
@@ -397,7 +397,7 @@ class ShipyardTransaction:
     timestamp: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ShipyardShip:
     type: str
     name: str
@@ -413,7 +413,7 @@ class ShipyardShip:
     modules: list[ShipModule] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Shipyard:
     symbol: str
     ship_types: list[ShipTypes]
@@ -422,12 +422,12 @@ class Shipyard:
     ships: list[ShipyardShip] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class SurveyDeposit:
     symbol: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Survey:
     signature: str
     symbol: str
@@ -436,7 +436,7 @@ class Survey:
     size: str
 
 
-@dataclass
+@dataclass(slots=True)
 class SystemWaypoint:
     symbol: str
     type: str
@@ -446,7 +446,7 @@ class SystemWaypoint:
     orbits: str = None  # optional
 
 
-@dataclass
+@dataclass(slots=True)
 class System:
     symbol: str
     sector_symbol: str
@@ -455,69 +455,171 @@ class System:
     y: int
     waypoints: list[SystemWaypoint]
     factions: list[FactionSymbol]
+    _waypoints_by_symbol: dict = field(init=False, repr=False, compare=False)
 
+    def __post_init__(self):
+        self._waypoints_by_symbol = {i.symbol: i for i in self.waypoints}
 
-class_dict = {}
-list_dict = {}
-global_objects = globals()
-classes_in_global_namespace = {name: obj for name, obj in global_objects.items() if isinstance(obj, type)}
-for name, obj in classes_in_global_namespace.items():
-    class_dict[name] = obj
-    list_dict[list[obj]] = obj
-
+    def get_waypoint(self, symbol):
+        """Looks up one of the system's waypoints by its symbol. The index is built when the system is created, so
+        replace `waypoints` with a new System rather than changing the list in place.
 
-def parser(data, model):
-    if model in list_dict:  # if we fit things into a list
-        result = []
-        for i in data:
-            result.append(parser(data=i, model=list_dict[model]))
-        return result
-    else:
-        class_info = {}  # dict passed to constructor
-        for key, value in data.items():
-            for i in fields(model):
-                if i.name == to_snake(key):
-                    if i.type in list_dict:  # if type is list of a models class
-                        class_info[i.name] = parser(data=value, model=i.type)
-                    elif i.type in class_dict.values():  # elif type is a models class
-                        class_info[i.name] = parser(data=value, model=i.type)
-                    else:  # primitive
-                        class_info[i.name] = value
-                    break
-
-        return model(**class_info)
+        Parameters:
+            symbol (str): Symbol of the waypoint, e.g. X1-DF55-20250Z
 
-
-def unpack(k):
-    if type(k) is list:  # if we fit things into a list
-        result = []
-        for i in k:
-            result.append(unpack(i))
-        return result
-    res = {}
-    if type(k) is dict:
-        for attr, value in k.items():
-            if type(value) is list or type(value) in class_dict.values():  # type is class or list of class
-                value = unpack(value)
-            res[to_lower_camel_case(attr)] = value
-        return res
-    for attr, value in k.__dict__.items():
-        if type(value) is list or type(value) in class_dict.values():  # type is class or list of class
-            value = unpack(value)
-        res[to_lower_camel_case(attr)] = value
-    return res
+        Returns:
+            SystemWaypoint: The waypoint or None if the system has no waypoint with that symbol
+        """
+        return self._waypoints_by_symbol.get(symbol)
 
 
+@lru_cache(maxsize=None)
 def to_snake(name):
-    return re.sub(r'(?<!^)(?=[A-Z])', '_', name).lower()
+    # Put an underscore before every capital but the first character, e.g. tradeSymbol -> trade_symbol
+    out = []
+    for i, c in enumerate(name):
+        if i and 'A' <= c <= 'Z':
+            out.append('_')
+        out.append(c)
+    return ''.join(out).lower()
 
 
 def to_camel_case(snake_str):
     return "".join(x.capitalize() for x in snake_str.lower().split("_"))
 
 
+@lru_cache(maxsize=None)
 def to_lower_camel_case(snake_str):
     # We capitalize the first letter of each component except the first one
     # with the 'capitalize' method and join them together.
     camel_string = to_camel_case(snake_str)
     return snake_str[0].lower() + camel_string[1:]
+
+
+class_dict = {}
+list_dict = {}
+global_objects = globals()
+# Only the dataclasses defined here are models, not classes that happen to be imported into the module
+classes_in_global_namespace = {name: obj for name, obj in global_objects.items()
+                               if isinstance(obj, type) and is_dataclass(obj) and obj.__module__ == __name__}
+for name, obj in classes_in_global_namespace.items():
+    class_dict[name] = obj
+    list_dict[list[obj]] = obj
+
+model_classes = frozenset(class_dict.values())
+
+
+def field_kind(i):
+    """Resolves a field's type once into (is_list, model), where model is the models class the field holds, or
+    the class of the list's items, and None for primitives"""
+    if i.type in list_dict:  # type is list of a models class
+        return True, list_dict[i.type]
+    if i.type in model_classes:  # type is a models class
+        return False, i.type
+    return False, None  # primitive
+
+
+# snake_case field name -> (is_list, model) for every model, so parser neither scans fields() nor hashes list[...].
+# Fields with init=False are derived, e.g. System's waypoint index, and are neither parsed nor unpacked.
+field_map = {obj: {i.name: field_kind(i) for i in fields(obj) if i.init} for obj in class_dict.values()}
+
+
+def make_parser_source(model):
+    """Generates the source of a function parsing the camelCase dict of `model` straight into the model, e.g. for
+    ShipFuel:
+
+        def parse_ShipFuel(d):
+            return ShipFuel(
+                d['current'],
+                d['capacity'],
+                parse_ShipFuelConsumed(d['consumed']),
+            )
+
+    Fields without a default are read with d[...] so a missing one still fails. Optional fields fall back to
+    their default when the key is missing or null. Models and lists of models are parsed by the generated parser
+    of their class.
+    """
+    lines = [f"def parse_{model.__name__}(d):", f"    return {model.__name__}("]
+    for i in fields(model):
+        if not i.init:
+            continue
+        key = to_lower_camel_case(i.name)
+        is_list, sub_model = field_map[model][i.name]
+        if sub_model is None:  # primitive
+            value = "{}"
+        elif is_list:
+            value = f"[parse_{sub_model.__name__}(i) for i in {{}}]"
+        else:
+            value = f"parse_{sub_model.__name__}({{}})"
+        if i.default is not MISSING:
+            default = f"defaults[{model.__name__!r}, {i.name!r}]"
+        elif i.default_factory is not MISSING:
+            default = f"factories[{model.__name__!r}, {i.name!r}]()"
+        else:
+            default = None
+        if to_snake(key) != i.name:  # no key of the API is converted to this field name, e.g. sectorSymbol
+            arg = f"d[{key!r}]" if default is None else default
+        elif default is None:
+            arg = value.format(f"d[{key!r}]")
+        elif sub_model is None:
+            arg = f"d.get({key!r}, {default})"
+        else:
+            arg = f"{value.format(f'd[{key!r}]')} if d.get({key!r}) is not None else {default}"
+        lines.append(f"        {arg},")
+    lines.append("    )")
+    return "\n".join(lines)
+
+
+def make_parsers():
+    """Compiles a parser for every model and for lists of every model, see `make_parser_source`"""
+    namespace = {
+        "defaults": {(obj.__name__, i.name): i.default for obj in class_dict.values() for i in fields(obj)},
+        "factories": {(obj.__name__, i.name): i.default_factory for obj in class_dict.values() for i in fields(obj)},
+        **class_dict,
+    }
+    source = "\n\n".join(make_parser_source(obj) for obj in class_dict.values())
+    exec(compile(source, "<models parsers>", "exec"), namespace)
+    result = {}
+    for name, obj in class_dict.items():
+        parse = namespace[f"parse_{name}"]
+        result[obj] = parse
+        result[list[obj]] = lambda data, parse=parse: [parse(i) for i in data]
+    return result
+
+
+parsers = make_parsers()
+
+
+def parser(data, model):
+    # Looks up the function generated for the model, or for the list of models, by make_parsers
+    return parsers[model](data)
+
+
+def unpack(k):
+    # Walks the object with an explicit work stack rather than recursion. Each work item is a container slot
+    # (parent, key) and the value to convert into it. Slots are filled with a placeholder first so keys keep
+    # their order.
+    result = [None]
+    stack = [(result, 0, k)]
+    while stack:
+        parent, key, value = stack.pop()
+        if type(value) is list:  # if we fit things into a list
+            out = [None] * len(value)
+            for i, item in enumerate(value):
+                if type(item) is list or type(item) is dict or type(item) in model_classes:
+                    stack.append((out, i, item))
+                else:  # primitives, e.g. the deposits of a ShipMount, are kept as they are
+                    out[i] = item
+        else:
+            out = {}
+            if type(value) is dict:
+                items = value.items()
+            else:  # models have slots and no __dict__, so read the fields by name
+                items = ((name, getattr(value, name)) for name in field_map[type(value)])
+            for attr, item in items:
+                attr = to_lower_camel_case(attr)
+                out[attr] = item
+                if type(item) is list or type(item) in model_classes:  # type is class or list of class
+                    stack.append((out, attr, item))
+        parent[key] = out
+    return result[0]
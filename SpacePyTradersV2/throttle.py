@@ -0,0 +1,145 @@
+import asyncio
+import random
+import threading
+import time
+
+
+class TokenBucket:
+    def __init__(self, calls=2, period=1.2, capacity=None):
+        """Token bucket rate limiter. Tokens refill continuously at `calls` per `period` seconds up to `capacity`.
+        Every request takes a token; when the bucket is empty the caller waits until its token has refilled, so
+        requests flow at the allowed rate instead of bursting and being throttled by the Space Traders API. The
+        rate backs off when the API throttles anyway, see `slow_down`.
+
+        Parameters:
+            calls (int, optional): How many calls are allowed per period. Defaults to 2.
+            period (float, optional): Length of the period in seconds. Defaults to 1.2.
+            capacity (int, optional): Maximum burst size. Defaults to `calls`.
+        """
+        self.max_rate = self.rate = calls / period
+        self.capacity = calls if capacity is None else capacity
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        """Takes a token and returns how many seconds the caller has to wait before it may use it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1
+            return 0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def observe(self, remaining):
+        """Lowers the tokens in the bucket to what the server reports as left, e.g. from the x-ratelimit-remaining
+        header, so requests made by other processes with the same agent slow this bucket down before the server
+        starts throttling. Does nothing when `remaining` is None or not a number."""
+        try:
+            remaining = float(remaining)
+        except (TypeError, ValueError):
+            return
+        with self._lock:
+            self._tokens = min(self._tokens, remaining)
+
+    def slow_down(self):
+        """Halves the refill rate after the server throttled a request or failed with an error that is retried, such
+        as a 500, down to 1/16 of the configured rate. Together with `speed_up` this adapts the rate additively
+        increasing, multiplicatively decreasing (AIMD) to the load the server actually accepts, e.g. when other
+        processes use the same agent or the server is overloaded."""
+        with self._lock:
+            self.rate = max(self.max_rate / 16, self.rate / 2)
+
+    def speed_up(self):
+        """Raises the refill rate by a twentieth of the configured rate after a request went through, up to the
+        configured rate"""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+    def acquire(self):
+        """Blocks the calling thread until a token is available. The bucket's lock is only held to take the token,
+        not while sleeping, so other threads can reserve theirs meanwhile."""
+        delay = self._reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        """Waits, without blocking the event loop, until a token is available"""
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+# Shared by every client, sync and async, so their combined request rate stays within the API's limit
+api_limiter = TokenBucket(calls=2, period=1.2)
+
+
+def retry_delay(attempt, cap=10, retry_after=None, base=0.5):
+    """Works out how long to wait before retrying a throttled or failed request. The server's Retry-After hint is
+    used when there is one, otherwise the wait doubles with every attempt up to `cap`. Up to 10% random jitter is
+    added so clients that were throttled together don't all retry at the same moment.
+
+    Parameters:
+        attempt (int): How many times the request has been tried before, starting at 0
+        cap (float, optional): Longest wait in seconds. Defaults to 10.
+        retry_after (str or float, optional): Seconds to wait as hinted by the server. Defaults to None.
+        base (float, optional): Wait in seconds after the first attempt. Defaults to 0.5.
+
+    Returns:
+        float: Seconds to wait
+    """
+    try:
+        delay = float(retry_after)
+    except (TypeError, ValueError):  # no hint or an HTTP date
+        delay = min(cap, base * 2 ** attempt)
+    return delay + random.uniform(0, delay * 0.1)
+
+
+def retry_after_hint(headers, error):
+    """Returns the server's retry hint from the Retry-After header, or the retryAfter of the error's data, or None"""
+    hint = headers.get('Retry-After')
+    if hint is None:
+        hint = (error['error'].get('data') or {}).get('retryAfter')
+    return hint
+
+
+# Ship actions, by the endpoint path after the ship symbol, that put the ship's reactor on cooldown
+cooldown_actions = {"survey", "extract", "extract/survey", "siphon", "refine", "jump", "scan/systems",
+                    "scan/waypoints", "scan/ships"}
+
+
+def cooldown_ship(method, endpoint):
+    """Returns the symbol of the ship a request to `endpoint` would put on cooldown, or None if it doesn't"""
+    if method != "POST" or not endpoint.startswith("my/ships/"):
+        return None
+    parts = endpoint.split("/", 3)
+    return parts[2] if len(parts) == 4 and parts[3] in cooldown_actions else None
+
+
+class CooldownTracker:
+    def __init__(self):
+        """Remembers until when each ship's reactor is cooling down, as reported by the API, so an action started
+        during the cooldown can be refused locally instead of costing a request that is bound to fail."""
+        self._expires = {}
+        self._lock = threading.Lock()
+
+    def start(self, cooldown):
+        """Records the cooldown of a response, a dict with the shipSymbol and its remainingSeconds"""
+        with self._lock:
+            self._expires[cooldown['shipSymbol']] = time.monotonic() + cooldown['remainingSeconds']
+
+    def remaining(self, ship_symbol):
+        """Returns how many seconds `ship_symbol` is still cooling down, 0 if it isn't"""
+        with self._lock:
+            expires = self._expires.get(ship_symbol)
+            if expires is None:
+                return 0
+            remaining = expires - time.monotonic()
+            if remaining <= 0:
+                del self._expires[ship_symbol]
+                return 0
+            return remaining
+
+
+# Shared by every client, sync and async, as a ship's cooldown applies to all of them
+ship_cooldowns = CooldownTracker()
@@ -0,0 +1,160 @@
+import asyncio
+import json
+import logging
+import os
+import unittest
+from unittest import mock
+
+import httpx
+
+from SpacePyTradersV2 import async_client, models
+from SpacePyTradersV2.cache import TTLCache
+from SpacePyTradersV2.throttle import TokenBucket, CooldownTracker
+
+with open(os.path.join(os.path.dirname(__file__), 'v2_mocks.json'), 'r') as infile:
+    MOCKS = json.load(infile)
+
+
+class AsyncClientTestCase(unittest.TestCase):
+    """Runs the async clients against an in-memory httpx transport. `handle` answers every request and `requests`
+    records them, the shared rate limiter and cooldowns are replaced so tests neither sleep nor affect each other."""
+
+    def setUp(self):
+        logging.disable()
+        self.requests = []
+        self.responses = {}
+        self.delays = {}
+        limiter = TokenBucket(calls=1000, period=1)
+        for patch in (mock.patch.object(async_client, "api_limiter", limiter),
+                      mock.patch.object(async_client, "ship_cooldowns", CooldownTracker()),
+                      mock.patch.object(async_client, "new_session", self.new_session)):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def new_session(self):
+        return httpx.AsyncClient(transport=httpx.MockTransport(self.handle))
+
+    async def handle(self, request):
+        self.requests.append(request)
+        await asyncio.sleep(self.delays.get(request.url.path, 0.01))  # lets concurrent requests overlap
+        response = self.responses.get(request.url.path)
+        if isinstance(response, Exception):
+            raise response
+        return response or httpx.Response(404, json={"error": {"code": 404, "message": "Not found"}})
+
+
+class TestAsyncClientEventLoops(AsyncClientTestCase):
+    def test_client_reused_by_consecutive_asyncio_runs(self):
+        """A client created outside any loop keeps working when each call runs in its own asyncio.run, also when its
+        semaphore is contended"""
+        contracts = async_client.AsyncContracts(token="t", max_concurrent=2)
+        ids = [str(i) for i in range(15)]
+        for contract_id in ids:
+            self.responses[f"/v2/my/contracts/{contract_id}/fulfill"] = httpx.Response(
+                200, json={"data": {"agent": MOCKS['agent'], "contract": MOCKS['contract']}})
+        for _ in range(2):
+            results = asyncio.run(contracts.fulfill_many(ids))
+            self.assertEqual(len(results), 15)
+            self.assertTrue(all(isinstance(res['contract'], models.Contract) for res in results))
+        self.assertEqual(len(self.requests), 30)
+
+    def test_api_reused_by_consecutive_asyncio_runs(self):
+        self.responses["/v2/my/contracts/c1"] = httpx.Response(200, json={"data": MOCKS['contract']})
+        api = async_client.AsyncApi(token="t")
+        for _ in range(2):
+            contracts = asyncio.run(self.get_contracts(api))
+            self.assertTrue(all(isinstance(contract, models.Contract) for contract in contracts))
+
+    @staticmethod
+    async def get_contracts(api):
+        async with api:
+            return await asyncio.gather(*(api.contracts.get_contract("c1") for _ in range(3)))
+
+
+class TestAsyncRequests(AsyncClientTestCase):
+    def setUp(self):
+        super().setUp()
+        self.responses["/v2/my/agent"] = httpx.Response(200, json={"data": MOCKS['agent']})
+
+    def test_identical_requests_in_flight_share_one_request(self):
+        agent = async_client.AsyncAgent(token="t")
+
+        async def main():
+            return await asyncio.gather(*(agent.get_agent() for _ in range(5)))
+
+        results = asyncio.run(main())
+        self.assertEqual(len(self.requests), 1)
+        self.assertTrue(all(result == results[0] and result is not results[0] for result in results[1:]))
+
+    def test_list_params_are_sent(self):
+        self.responses["/v2/systems/X1/waypoints"] = httpx.Response(
+            200, json={"data": [MOCKS['waypoint']], "meta": {"total": 1, "page": 1, "limit": 20}})
+        systems = async_client.AsyncSystems(token="t")
+        waypoints = asyncio.run(systems.list_all_waypoints_in_system("X1", traits=["MARKETPLACE", "SHIPYARD"]))
+        self.assertIsInstance(waypoints[0], models.Waypoint)
+        self.assertEqual(self.requests[0].url.params.get_list("traits"), ["MARKETPLACE", "SHIPYARD"])
+
+    def test_cache_hit_makes_no_request(self):
+        agent = async_client.AsyncAgent(token="t", cache=TTLCache())
+        first = asyncio.run(agent.get_agent())
+        self.assertEqual(asyncio.run(agent.get_agent()), first)
+        self.assertEqual(len(self.requests), 1)
+
+    def test_ship_on_cooldown_is_refused_without_a_request(self):
+        cooldown = {"shipSymbol": "SHIP-1", "totalSeconds": 70, "remainingSeconds": 60}
+        self.responses["/v2/my/ships/SHIP-1/survey"] = httpx.Response(
+            201, json={"data": {"cooldown": cooldown, "surveys": [MOCKS['survey']]}})
+        fleet = async_client.AsyncFleet(token="t")
+        self.assertIsInstance(asyncio.run(fleet.create_survey("SHIP-1")), dict)
+        self.assertIs(asyncio.run(fleet.create_survey("SHIP-1")), False)
+        self.assertEqual(len(self.requests), 1)
+
+
+class TestAsyncContractsMany(AsyncClientTestCase):
+    def contract_response(self, contract_id):
+        return httpx.Response(200, json={"data": {"agent": MOCKS['agent'],
+                                                  "contract": {**MOCKS['contract'], "id": contract_id}}})
+
+    def test_results_keep_the_order_of_the_ids(self):
+        ids = ["a", "b", "c", "d"]
+        for i, contract_id in enumerate(ids):
+            self.responses[f"/v2/my/contracts/{contract_id}/accept"] = self.contract_response(contract_id)
+            self.delays[f"/v2/my/contracts/{contract_id}/accept"] = 0.04 - i * 0.01  # later IDs answer first
+        contracts = async_client.AsyncContracts(token="t")
+        results = asyncio.run(contracts.accept_many(ids))
+        self.assertEqual([res['contract'].id for res in results], ids)
+
+    def test_failed_contracts_are_false(self):
+        self.responses["/v2/my/contracts/ok/fulfill"] = self.contract_response("ok")
+        self.responses["/v2/my/contracts/rejected/fulfill"] = httpx.Response(
+            400, json={"error": {"code": 4502, "message": "Contract terms not met"}})
+        self.responses["/v2/my/contracts/unreachable/fulfill"] = httpx.ConnectError("connection refused")
+        contracts = async_client.AsyncContracts(token="t")
+        results = asyncio.run(contracts.fulfill_many(["rejected", "ok", "unreachable"]))
+        self.assertIs(results[0], False)
+        self.assertEqual(results[1]['contract'].id, "ok")
+        self.assertIs(results[2], False)
+
+    def test_contracts_failing_every_retry_are_false(self):
+        self.responses["/v2/my/contracts/ok/accept"] = self.contract_response("ok")
+        self.responses["/v2/my/contracts/overloaded/accept"] = httpx.Response(
+            500, json={"error": {"code": 500, "message": "Overloaded"}})
+        contracts = async_client.AsyncContracts(token="t")
+        with mock.patch.object(async_client, "retry_delay", lambda *args: 0):
+            results = asyncio.run(contracts.accept_many(["overloaded", "ok"]))
+        self.assertIs(results[0], False)
+        self.assertEqual(results[1]['contract'].id, "ok")
+
+    def test_bugs_are_raised(self):
+        self.responses["/v2/my/contracts/broken/accept"] = httpx.Response(200, json={"data": {"agent": MOCKS['agent']}})
+        contracts = async_client.AsyncContracts(token="t")
+        with self.assertRaises(KeyError):
+            asyncio.run(contracts.accept_many(["broken"]))
+
+    def test_single_contract_failing_to_connect_is_false(self):
+        self.responses["/v2/my/contracts/unreachable"] = httpx.ConnectError("connection refused")
+        contracts = async_client.AsyncContracts(token="t")
+        self.assertIs(asyncio.run(contracts.get_contract("unreachable")), False)
@@ -0,0 +1,171 @@
+import asyncio
+import threading
+import unittest
+from unittest import mock
+
+from SpacePyTradersV2 import cache as cache_module
+from SpacePyTradersV2.cache import TTLCache, SingleFlight, request_key, invalidation_scope, invalidation_scopes
+
+URL = "https://api.spacetraders.io/v2/"
+
+
+class TestRequestKey(unittest.TestCase):
+    def test_param_order_does_not_matter(self):
+        self.assertEqual(request_key(URL, "t", "systems", {"page": 1, "limit": 20}),
+                         request_key(URL, "t", "systems", {"limit": 20, "page": 1}))
+
+    def test_list_values_are_hashable(self):
+        key = request_key(URL, "t", "systems/X1/waypoints", {"traits": ["MARKETPLACE", "SHIPYARD"]})
+        self.assertEqual(hash(key), hash(request_key(URL, "t", "systems/X1/waypoints",
+                                                     {"traits": ["MARKETPLACE", "SHIPYARD"]})))
+        self.assertNotEqual(key, request_key(URL, "t", "systems/X1/waypoints", {"traits": ["MARKETPLACE"]}))
+
+    def test_token_and_url_are_part_of_the_key(self):
+        key = request_key(URL, "t", "my/agent")
+        self.assertNotEqual(key, request_key(URL, "other", "my/agent"))
+        self.assertNotEqual(key, request_key("https://other.example/v2/", "t", "my/agent"))
+
+
+class TestInvalidation(unittest.TestCase):
+    def test_scope_of_a_mutating_endpoint(self):
+        self.assertEqual(invalidation_scope("my/contracts/123/accept"), "my/contracts")
+        self.assertEqual(invalidation_scope("my/ships/S-1/dock"), "my/ships")
+
+    def test_scopes_reach_beyond_the_endpoints_own(self):
+        self.assertEqual(invalidation_scopes("my/contracts/123/deliver"), [("my/", None)])
+        self.assertEqual(invalidation_scopes("systems/X1/waypoints/X1-A1/construction/supply"),
+                         [("my/", None), ("systems/X1", None)])
+        self.assertEqual(invalidation_scopes("my/ships/S-1/sell"), [("my/", None), ("systems/", "market")])
+        self.assertEqual(invalidation_scopes("my/ships"), [("my/", None), ("systems/", "shipyard")])
+        self.assertEqual(invalidation_scopes("my/ships/S-1/scan/ships"), [("my/", None)])
+
+    def test_invalidate_by_last_segment(self):
+        cache = TTLCache()
+        cache.set(request_key(URL, "t", "systems/X1/waypoints/X1-A1/market"), b"1")
+        cache.set(request_key(URL, "t", "systems/X1/waypoints/X1-A1"), b"2")
+        cache.invalidate("systems/", URL, "t", "market")
+        self.assertIsNone(cache.get(request_key(URL, "t", "systems/X1/waypoints/X1-A1/market")))
+        self.assertEqual(cache.get(request_key(URL, "t", "systems/X1/waypoints/X1-A1")), b"2")
+
+    def test_invalidate_only_drops_entries_of_the_given_agent(self):
+        cache = TTLCache()
+        cache.set(request_key(URL, "one", "my/contracts/1"), b"1")
+        cache.set(request_key(URL, "two", "my/contracts/1"), b"2")
+        cache.set(request_key(URL, "one", "my/ships"), b"3")
+        cache.invalidate("my/contracts", URL, "one")
+        self.assertIsNone(cache.get(request_key(URL, "one", "my/contracts/1")))
+        self.assertEqual(cache.get(request_key(URL, "two", "my/contracts/1")), b"2")
+        self.assertEqual(cache.get(request_key(URL, "one", "my/ships")), b"3")
+
+
+class TestTTLCache(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patch = mock.patch.object(cache_module.time, "monotonic", lambda: self.now)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_entries_expire_after_their_ttl(self):
+        cache = TTLCache(ttl=30)
+        cache.set("a", b"1")
+        cache.set("b", b"2", ttl=5)
+        self.now += 10
+        self.assertEqual(cache.get("a"), b"1")
+        self.assertIsNone(cache.get("b"))
+        self.now += 30
+        self.assertIsNone(cache.get("a"))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = TTLCache(maxsize=2)
+        cache.set("a", b"1")
+        cache.set("b", b"2")
+        cache.get("a")
+        cache.set("c", b"3")
+        self.assertEqual(cache.get("a"), b"1")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), b"3")
+
+    def test_ttl_policies_by_last_path_segment(self):
+        cache = TTLCache(ttl=30)
+        self.assertEqual(cache.ttl_for("systems/X1-A/waypoints/X1-A-B/market"), 10)
+        self.assertEqual(cache.ttl_for("systems/X1-A/waypoints/X1-A-B/jump-gate"), 600)
+        self.assertEqual(cache.ttl_for("my/ships"), 30)
+        self.assertLess(cache.ttl_for("my/ships/SHIP-1/nav"), 1)
+        self.assertLess(cache.ttl_for("my/ships/SHIP-1/cooldown"), 1)
+        self.assertEqual(TTLCache(ttl=30, policies={}).ttl_for("systems/X1-A/waypoints/X1-A-B/market"), 30)
+
+    def test_expired_entries_with_an_etag_can_be_revalidated(self):
+        cache = TTLCache(ttl=5)
+        cache.set("tagged", b"1", etag='"v1"')
+        cache.set("untagged", b"2")
+        self.now += 10
+        self.assertIsNone(cache.get("tagged"))
+        self.assertIsNone(cache.get("untagged"))
+        self.assertEqual(cache.etag("tagged"), '"v1"')
+        self.assertIsNone(cache.etag("untagged"))
+        self.assertEqual(cache.revalidate("tagged"), b"1")
+        self.assertEqual(cache.get("tagged"), b"1")
+        self.assertIsNone(cache.revalidate("untagged"))
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_callers_share_one_call(self):
+        flight = SingleFlight()
+        calls = []
+        release = threading.Event()
+
+        def call():
+            calls.append(1)
+            release.wait(5)
+            return b"result"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flight.do("key", call))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        threading.Event().wait(0.1)  # lets every thread reach the flight before the call finishes
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [b"result"] * 5)
+        self.assertEqual(flight.do("key", lambda: b"next"), b"next")
+
+    def test_exceptions_are_raised_to_every_caller(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        errors = []
+
+        def call():
+            release.wait(5)
+            raise ConnectionError("down")
+
+        def caller():
+            try:
+                flight.do("key", call)
+            except ConnectionError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=caller) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        threading.Event().wait(0.1)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(len(errors), 3)
+
+    def test_concurrent_tasks_share_one_call(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def call():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return b"result"
+
+        async def main():
+            return await asyncio.gather(*(flight.do_async("key", call) for _ in range(5)))
+
+        self.assertEqual(asyncio.run(main()), [b"result"] * 5)
+        self.assertEqual(len(calls), 1)
@@ -0,0 +1,114 @@
+import unittest
+from unittest import mock
+
+from SpacePyTradersV2 import throttle
+from SpacePyTradersV2.throttle import TokenBucket, CooldownTracker, retry_delay, retry_after_hint, cooldown_ship
+
+
+class FakeClockTestCase(unittest.TestCase):
+    """Replaces the clock of the throttle module with `self.now`"""
+
+    def setUp(self):
+        self.now = 1000.0
+        patch = mock.patch.object(throttle.time, "monotonic", lambda: self.now)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+
+class TestTokenBucket(FakeClockTestCase):
+    def test_waits_once_the_burst_is_used_up(self):
+        bucket = TokenBucket(calls=2, period=1)
+        self.assertEqual(bucket._reserve(), 0)
+        self.assertEqual(bucket._reserve(), 0)
+        self.assertAlmostEqual(bucket._reserve(), 0.5)
+        self.assertAlmostEqual(bucket._reserve(), 1)
+
+    def test_tokens_refill_over_time(self):
+        bucket = TokenBucket(calls=2, period=1)
+        bucket._reserve()
+        bucket._reserve()
+        self.now += 0.5
+        self.assertEqual(bucket._reserve(), 0)
+        self.now += 10
+        self.assertEqual(bucket._reserve(), 0)
+        self.assertEqual(bucket._reserve(), 0)
+        self.assertGreater(bucket._reserve(), 0)
+
+    def test_observe_lowers_the_tokens_to_what_the_server_reports(self):
+        bucket = TokenBucket(calls=2, period=1)
+        bucket.observe("0")
+        self.assertAlmostEqual(bucket._reserve(), 0.5)
+        bucket.observe(None)
+        bucket.observe("not a number")
+        bucket.observe("5")  # never adds tokens
+        self.assertAlmostEqual(bucket._reserve(), 1)
+
+
+class TestAdaptiveRate(unittest.TestCase):
+    def test_slow_down_halves_the_rate_down_to_a_sixteenth(self):
+        bucket = TokenBucket(calls=2, period=1)
+        bucket.slow_down()
+        self.assertAlmostEqual(bucket.rate, 1)
+        for _ in range(10):
+            bucket.slow_down()
+        self.assertAlmostEqual(bucket.rate, 2 / 16)
+
+    def test_speed_up_recovers_additively_up_to_the_configured_rate(self):
+        bucket = TokenBucket(calls=2, period=1)
+        bucket.slow_down()
+        bucket.speed_up()
+        self.assertAlmostEqual(bucket.rate, 1 + 2 / 20)
+        for _ in range(100):
+            bucket.speed_up()
+        self.assertAlmostEqual(bucket.rate, 2)
+
+
+class TestRetryDelay(unittest.TestCase):
+    def test_doubles_with_every_attempt_up_to_the_cap(self):
+        for attempt, expected in ((0, 0.5), (1, 1), (2, 2), (3, 4), (6, 10)):
+            delay = retry_delay(attempt, cap=10)
+            self.assertGreaterEqual(delay, expected)
+            self.assertLessEqual(delay, expected * 1.1)
+
+    def test_follows_the_servers_hint(self):
+        delay = retry_delay(0, retry_after="2")
+        self.assertGreaterEqual(delay, 2)
+        self.assertLessEqual(delay, 2.2)
+        delay = retry_delay(0, retry_after=30)
+        self.assertGreaterEqual(delay, 30)  # the cap only applies to the doubling
+
+    def test_ignores_hints_that_are_not_seconds(self):
+        delay = retry_delay(1, retry_after="Wed, 21 Oct 2015 07:28:00 GMT")
+        self.assertGreaterEqual(delay, 1)
+        self.assertLessEqual(delay, 1.1)
+
+
+class TestRetryAfterHint(unittest.TestCase):
+    error = {"error": {"code": 42901, "message": "Throttled", "data": {"retryAfter": 1.5}}}
+
+    def test_header_comes_first(self):
+        self.assertEqual(retry_after_hint({"Retry-After": "3"}, self.error), "3")
+
+    def test_falls_back_to_the_error_data(self):
+        self.assertEqual(retry_after_hint({}, self.error), 1.5)
+        self.assertIsNone(retry_after_hint({}, {"error": {"code": 42901, "message": "Throttled"}}))
+
+
+class TestCooldowns(FakeClockTestCase):
+    def test_ship_actions_that_cause_a_cooldown(self):
+        self.assertEqual(cooldown_ship("POST", "my/ships/SHIP-1/extract"), "SHIP-1")
+        self.assertEqual(cooldown_ship("POST", "my/ships/SHIP-1/extract/survey"), "SHIP-1")
+        self.assertEqual(cooldown_ship("POST", "my/ships/SHIP-1/scan/ships"), "SHIP-1")
+        self.assertIsNone(cooldown_ship("GET", "my/ships/SHIP-1/extract"))
+        self.assertIsNone(cooldown_ship("POST", "my/ships/SHIP-1/dock"))
+        self.assertIsNone(cooldown_ship("POST", "my/ships"))
+
+    def test_tracker_counts_down_the_remaining_seconds(self):
+        cooldowns = CooldownTracker()
+        self.assertEqual(cooldowns.remaining("SHIP-1"), 0)
+        cooldowns.start({"shipSymbol": "SHIP-1", "totalSeconds": 70, "remainingSeconds": 60})
+        self.now += 20
+        self.assertAlmostEqual(cooldowns.remaining("SHIP-1"), 40)
+        self.assertEqual(cooldowns.remaining("SHIP-2"), 0)
+        self.now += 40
+        self.assertEqual(cooldowns.remaining("SHIP-1"), 0)
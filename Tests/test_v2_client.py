@@ -0,0 +1,278 @@
+import json
+import logging
+import os
+import threading
+import unittest
+from unittest import mock
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from SpacePyTradersV2 import cache as cache_module, client, models
+from SpacePyTradersV2.cache import TTLCache, SingleFlight
+from SpacePyTradersV2.throttle import TokenBucket, CooldownTracker
+
+with open(os.path.join(os.path.dirname(__file__), 'v2_mocks.json'), 'r') as infile:
+    MOCKS = json.load(infile)
+
+
+def make_response(method, url, status=200, json_body=None, headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response._content = b"" if json_body is None else json.dumps(json_body).encode()
+    response.headers = CaseInsensitiveDict(headers or {})
+    response.url = url
+    response.request = requests.Request(method, url).prepare()
+    return response
+
+
+class FakeSession:
+    """Stands in for a requests.Session. Answers each request with `handle(method, url, headers, kwargs)` and
+    records it in `requests`."""
+
+    def __init__(self, handle):
+        self.handle = handle
+        self.requests = []
+
+    def request(self, method, url, headers=None, **kwargs):
+        self.requests.append((method, url, headers, kwargs))
+        return self.handle(method, url, headers, kwargs)
+
+    def close(self):
+        pass
+
+
+class SyncClientTestCase(unittest.TestCase):
+    """Replaces the shared rate limiter and cooldowns so tests neither sleep nor affect each other"""
+
+    def setUp(self):
+        logging.disable()
+        self.limiter = TokenBucket(calls=1000, period=1)
+        self.cooldowns = CooldownTracker()
+        for patch in (mock.patch.object(client, "api_limiter", self.limiter),
+                      mock.patch.object(client, "ship_cooldowns", self.cooldowns)):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+
+class TestSharedCache(SyncClientTestCase):
+    def setUp(self):
+        super().setUp()
+        self.session = FakeSession(self.agent_of_token)
+
+    @staticmethod
+    def agent_of_token(method, url, headers, kwargs):
+        symbol = headers['Authorization'].split()[-1].upper()
+        return make_response(method, url, json_body={"data": {**MOCKS['agent'], "symbol": symbol}})
+
+    def test_agents_sharing_a_cache_get_their_own_responses(self):
+        cache = TTLCache()
+        first = client.Agent(token="one", session=self.session, cache=cache)
+        second = client.Agent(token="two", session=self.session, cache=cache)
+        self.assertEqual(first.get_agent().symbol, "ONE")
+        self.assertEqual(second.get_agent().symbol, "TWO")
+        self.assertEqual(first.get_agent().symbol, "ONE")
+        self.assertEqual(len(self.session.requests), 2)
+
+    def test_cache_hits_are_fresh_copies(self):
+        session = FakeSession(lambda method, url, headers, kwargs: make_response(method, url,
+                                                                                 json_body={"data": MOCKS['ship']}))
+        fleet = client.Fleet(token="t", session=session, cache=TTLCache())
+        fleet.get_ship("SHIP-1").mounts[0].deposits.append("CHANGED_BY_CALLER")
+        self.assertEqual(fleet.get_ship("SHIP-1").mounts[0].deposits, ["IRON_ORE"])
+        self.assertEqual(len(session.requests), 1)
+
+
+class TestCoalescing(SyncClientTestCase):
+    def setUp(self):
+        super().setUp()
+        self.release = threading.Event()
+        self.session = FakeSession(self.slow_agent)
+        patch = mock.patch.object(client, "inflight_requests", SingleFlight())
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def slow_agent(self, method, url, headers, kwargs):
+        self.release.wait(5)
+        return make_response(method, url, json_body={"data": MOCKS['agent']})
+
+    def test_identical_requests_in_flight_share_one_request(self):
+        agent = client.Agent(token="t", session=self.session)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(agent.get_agent())) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        threading.Event().wait(0.1)  # lets every thread join the request in flight
+        self.release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(len(self.session.requests), 1)
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(result == results[0] and result is not results[0] for result in results[1:]))
+
+
+class TestQueryParams(SyncClientTestCase):
+    def test_list_params_are_sent(self):
+        """Every GET goes through the single flight, whose key must hold lists such as several traits"""
+        session = FakeSession(lambda method, url, headers, kwargs: make_response(
+            method, url, json_body={"data": [MOCKS['waypoint']], "meta": {"total": 1, "page": 1, "limit": 10}}))
+        systems = client.Systems(token="t", session=session)
+        res = systems.list_waypoints_in_system("X1", traits=["MARKETPLACE", "SHIPYARD"])
+        self.assertIsInstance(res['waypoints'][0], models.Waypoint)
+        self.assertEqual(session.requests[0][3]['params']['traits'], ["MARKETPLACE", "SHIPYARD"])
+
+
+class TestCaching(SyncClientTestCase):
+    def test_cache_hit_makes_no_request(self):
+        session = FakeSession(lambda method, url, headers, kwargs: make_response(method, url,
+                                                                                 json_body={"data": MOCKS['agent']}))
+        agent = client.Agent(token="t", session=session, cache=TTLCache())
+        self.assertEqual(agent.get_agent(), agent.get_agent())
+        self.assertEqual(len(session.requests), 1)
+
+    def test_polled_ship_nav_is_only_briefly_cached(self):
+        session = FakeSession(lambda method, url, headers, kwargs: make_response(method, url,
+                                                                                 json_body={"data": MOCKS['nav']}))
+        fleet = client.Fleet(token="t", session=session, cache=TTLCache())
+        fleet.get_ship_nav("SHIP-1")
+        fleet.get_ship_nav("SHIP-1")
+        self.assertEqual(len(session.requests), 1)
+        with mock.patch.object(cache_module.time, "monotonic", lambda now=cache_module.time.monotonic(): now + 1):
+            fleet.get_ship_nav("SHIP-1")
+        self.assertEqual(len(session.requests), 2)
+
+    def test_without_a_cache_every_call_makes_a_request(self):
+        session = FakeSession(lambda method, url, headers, kwargs: make_response(method, url,
+                                                                                 json_body={"data": MOCKS['agent']}))
+        agent = client.Agent(token="t", session=session)
+        agent.get_agent()
+        agent.get_agent()
+        self.assertEqual(len(session.requests), 2)
+
+    def test_expired_response_is_revalidated_with_its_etag(self):
+        def handle(method, url, headers, kwargs):
+            if headers.get('If-None-Match') == '"v1"':
+                return make_response(method, url, 304)
+            return make_response(method, url, json_body={"data": MOCKS['agent']}, headers={'ETag': '"v1"'})
+
+        session = FakeSession(handle)
+        agent = client.Agent(token="t", session=session, cache=TTLCache(ttl=0))
+        first = agent.get_agent()
+        self.assertEqual(agent.get_agent(), first)
+        self.assertEqual(len(session.requests), 2)
+        self.assertNotIn('If-None-Match', session.requests[0][2])
+        self.assertEqual(session.requests[1][2]['If-None-Match'], '"v1"')
+
+    def test_post_drops_the_cached_responses_it_affects(self):
+        def handle(method, url, headers, kwargs):
+            if method == "POST":
+                return make_response(method, url, json_body={"data": {"agent": MOCKS['agent'],
+                                                                       "contract": MOCKS['contract']}})
+            return make_response(method, url, json_body={"data": MOCKS['contract']})
+
+        session = FakeSession(handle)
+        contracts = client.Contracts(token="t", session=session, cache=TTLCache())
+        contracts.get_contract("c1")
+        contracts.get_contract("c1")
+        contracts.accept_contract("c1")
+        contracts.get_contract("c1")
+        self.assertEqual([request[0] for request in session.requests], ["GET", "POST", "GET"])
+
+    def test_actions_drop_what_they_change_in_other_scopes(self):
+        def handle(method, url, headers, kwargs):
+            if url.endswith("/deliver"):
+                data = {"contract": MOCKS['contract'], "cargo": MOCKS['ship']['cargo']}
+            elif url.endswith("/sell"):
+                data = {"agent": MOCKS['agent'], "cargo": MOCKS['ship']['cargo'],
+                        "transaction": MOCKS['market']['transactions'][0]}
+            elif url.endswith("/cargo"):
+                data = MOCKS['ship']['cargo']
+            elif url.endswith("/market"):
+                data = MOCKS['market']
+            else:
+                data = MOCKS['system']
+            return make_response(method, url, json_body={"data": data})
+
+        session = FakeSession(handle)
+        cache = TTLCache()
+        fleet = client.Fleet(token="t", session=session, cache=cache)
+        systems = client.Systems(token="t", session=session, cache=cache)
+        contracts = client.Contracts(token="t", session=session, cache=cache)
+
+        def fetch():
+            fleet.get_ship_cargo("SHIP-1")
+            systems.get_market("X1", "X1-A1")
+            systems.get_system("X1")
+
+        def gets():
+            return [request[1].rsplit("/", 1)[-1] for request in session.requests if request[0] == "GET"]
+
+        fetch()
+        contracts.deliver_cargo_to_contract("SHIP-1", "c1", "IRON_ORE", 1)
+        fetch()
+        self.assertEqual(gets(), ["cargo", "market", "X1", "cargo"])
+        fleet.sell_cargo("SHIP-1", "IRON_ORE", 1)
+        fetch()
+        self.assertEqual(gets(), ["cargo", "market", "X1", "cargo", "cargo", "market"])
+
+
+class TestCooldowns(SyncClientTestCase):
+    def test_ship_on_cooldown_is_refused_without_a_request(self):
+        cooldown = {"shipSymbol": "SHIP-1", "totalSeconds": 70, "remainingSeconds": 60}
+        session = FakeSession(lambda method, url, headers, kwargs: make_response(
+            method, url, 201, {"data": {"cooldown": cooldown, "surveys": [MOCKS['survey']]}}))
+        fleet = client.Fleet(token="t", session=session)
+        survey = fleet.create_survey("SHIP-1")
+        self.assertEqual(survey['cooldown'].remaining_seconds, 60)
+        self.assertIs(fleet.create_survey("SHIP-1"), False)
+        self.assertEqual(len(session.requests), 1)
+        self.assertIsInstance(fleet.create_survey("SHIP-2"), dict)  # other ships aren't affected
+        self.assertEqual(len(session.requests), 2)
+
+
+class TestFailures(SyncClientTestCase):
+    def test_connection_errors_are_false(self):
+        def refuse(method, url, headers, kwargs):
+            raise requests.ConnectionError("connection refused")
+
+        contracts = client.Contracts(token="t", session=FakeSession(refuse))
+        self.assertIs(contracts.get_contract("c1"), False)
+        self.assertIs(contracts.deliver_cargo_to_contract("SHIP-1", "c1", "IRON_ORE", 1), False)
+
+
+class TestRetries(SyncClientTestCase):
+    def setUp(self):
+        super().setUp()
+        self.sleeps = []
+        patch = mock.patch.object(client.time, "sleep", self.sleeps.append)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def respond_in_turn(self, *responses):
+        responses = list(responses)
+        return FakeSession(lambda method, url, headers, kwargs: responses.pop(0)(method, url))
+
+    def test_server_errors_are_retried_at_a_lower_rate(self):
+        session = self.respond_in_turn(
+            lambda method, url: make_response(method, url, 500, {"error": {"code": 500, "message": "Overloaded"}}),
+            lambda method, url: make_response(method, url, json_body={"data": MOCKS['agent']}))
+        agent = client.Agent(token="t", session=session).get_agent()
+        self.assertIsInstance(agent, models.Agent)
+        self.assertEqual(len(session.requests), 2)
+        self.assertEqual(len(self.sleeps), 1)
+        self.assertLess(self.limiter.rate, self.limiter.max_rate)
+
+    def test_throttled_requests_wait_as_long_as_the_server_asks(self):
+        session = self.respond_in_turn(
+            lambda method, url: make_response(method, url, 429, {"error": {"code": 42901, "message": "Throttled"}},
+                                              headers={'Retry-After': "2"}),
+            lambda method, url: make_response(method, url, json_body={"data": MOCKS['agent']}))
+        client.Agent(token="t", session=session).get_agent()
+        self.assertEqual(len(session.requests), 2)
+        self.assertEqual(len(self.sleeps), 1)
+        self.assertGreaterEqual(self.sleeps[0], 2)
+        self.assertLessEqual(self.sleeps[0], 2.2)
+        self.assertLess(self.limiter.rate, self.limiter.max_rate)
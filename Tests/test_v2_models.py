@@ -0,0 +1,54 @@
+import json
+import os
+import unittest
+from dataclasses import fields
+
+from SpacePyTradersV2 import models
+
+with open(os.path.join(os.path.dirname(__file__), 'v2_mocks.json'), 'r') as infile:
+    MOCKS = json.load(infile)
+
+SAMPLES = {'nav': models.ShipNav, 'ship': models.Ship, 'market': models.Market, 'waypoint': models.Waypoint,
+           'contract': models.Contract, 'system': models.System, 'agent': models.Agent, 'survey': models.Survey}
+
+
+def recursive_parser(data, model):
+    # The recursive parser the generated ones replaced, kept as the reference they are checked against
+    if model in models.list_dict:  # if we fit things into a list
+        return [recursive_parser(i, models.list_dict[model]) for i in data]
+    class_info = {}  # dict passed to constructor
+    for key, value in data.items():
+        for i in fields(model):
+            if i.name == models.to_snake(key):
+                if i.type in models.list_dict or i.type in models.class_dict.values():  # models class or list of them
+                    class_info[i.name] = recursive_parser(value, i.type)
+                else:  # primitive
+                    class_info[i.name] = value
+                break
+    return model(**class_info)
+
+
+class TestParser(unittest.TestCase):
+    def test_generated_parsers_match_the_recursive_parser(self):
+        for name, model in SAMPLES.items():
+            with self.subTest(name):
+                self.assertEqual(models.parser(MOCKS[name], model), recursive_parser(MOCKS[name], model))
+                self.assertEqual(models.parser([MOCKS[name]] * 2, list[model]),
+                                 recursive_parser([MOCKS[name]] * 2, list[model]))
+
+    def test_missing_optional_fields_get_their_default(self):
+        waypoint = {key: value for key, value in MOCKS['system']['waypoints'][0].items() if key != 'orbits'}
+        self.assertIsNone(models.parser(waypoint, models.SystemWaypoint).orbits)
+        self.assertEqual(models.parser(waypoint, models.SystemWaypoint),
+                         recursive_parser(waypoint, models.SystemWaypoint))
+
+    def test_missing_required_field_fails(self):
+        agent = {key: value for key, value in MOCKS['agent'].items() if key != 'credits'}
+        with self.assertRaises(KeyError):
+            models.parser(agent, models.Agent)
+
+    def test_unpack_inverts_the_parser(self):
+        for name, model in SAMPLES.items():
+            with self.subTest(name):
+                parsed = models.parser(MOCKS[name], model)
+                self.assertEqual(models.parser(models.unpack(parsed), model), parsed)
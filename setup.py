@@ -21,15 +21,20 @@ setup(
     author_email="zac.g.hooper@gmail.com",
     py_modules=["client"],
     packages=["SpacePyTradersV2"],
+    python_requires=">=3.10",
     install_requires=[
-        "requests ~= 2.25.1",
-        "ratelimit==2.2.1"
+        "requests >= 2.30",
+        "urllib3 >= 2.0",
     ],
+    extras_require={
+        "async": ["httpx[http2]"],
+        "speedups": ["orjson"],
+        "compression": ["brotli", "zstandard"],
+    },
     classifiers = [
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.6",
-        "Programming Language :: Python :: 3.7",
-        "Programming Language :: Python :: 3.8",
+        "Programming Language :: Python :: 3.10",
+        "Programming Language :: Python :: 3.11",
         "License :: OSI Approved :: GNU General Public License v2 or later (GPLv2+)",
         "Operating System :: OS Independent"
     ],